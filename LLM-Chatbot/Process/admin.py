@@ -1,80 +1,257 @@
-import sqlite3
+import csv
+import io
 import streamlit as st
+from Process.cache import TTLCache
 from Process.database import get_db_connection
+from Process.quote_store import invalidate_quotes, QUOTES_VERSION_KEY
+from Process.instrumentation import instrument
+from Process.versions import get_version
+
+QUOTE_CATEGORIES = ["saving", "budgeting", "debt management", "success"]
+PAGE_SIZES = [10, 25, 50, 100]
+_count_cache = TTLCache(maxsize=256, ttl=300)  # (filters, quotes version) -> row count
+IS_ADMIN_SQL = "SELECT * FROM admins WHERE username = ?"
 
 # ✅ Check if a user is an admin
+@instrument()
 def is_admin(username):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM admins WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(IS_ADMIN_SQL, (username,))
+        result = cursor.fetchone()
     return result is not None  # Returns True if user is an admin
 
 # ✅ Add a new admin user (Manually run once)
+@instrument()
 def add_admin(username):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO admins (username) VALUES (?)", (username,))
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO admins (username) VALUES (?)", (username,))
     st.success(f"{username} has been added as an admin!")
 
 # ✅ Add a new quote
+@instrument()
 def add_quote(category, quote):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO motivational_quotes (category, quote) VALUES (?, ?)", (category, quote))
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO motivational_quotes (category, quote) VALUES (?, ?)", (category, quote))
+    invalidate_quotes()
 
 # ✅ Fetch all quotes for admin management
+@instrument()
 def get_motivational_quote():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, category, quote FROM motivational_quotes")
-    quotes = cursor.fetchall()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, category, quote FROM motivational_quotes")
+        quotes = cursor.fetchall()
     return quotes
 
 # ✅ Delete a quote (Admin-only)
+@instrument()
 def delete_quote(quote_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM motivational_quotes WHERE id = ?", (quote_id,))
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM motivational_quotes WHERE id = ?", (quote_id,))
+    invalidate_quotes()
     st.success("Quote deleted successfully!")
 
-# ✅ Admin Panel UI
-def admin_panel():
-    if "logged_in" in st.session_state and st.session_state.logged_in:
-        username = st.session_state.username
+def _quote_filters(search=None, category=None):
+    clauses, params = [], []
+    if category:
+        clauses.append("category = ?")
+        params.append(category)
+    if search:
+        clauses.append("quote LIKE ?")
+        params.append(f"%{search}%")
+    return clauses, params
+
+# ✅ One page of quotes, keyset-paginated on id (cost depends on page size, not table size)
+@instrument()
+def get_quotes_page(after_id=0, page_size=25, search=None, category=None):
+    clauses, params = _quote_filters(search, category)
+    where = " AND ".join(["id > ?"] + clauses)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT id, category, quote FROM motivational_quotes WHERE {where} ORDER BY id LIMIT ?",
+                       (after_id, *params, page_size + 1))
+        rows = cursor.fetchall()
+
+    next_after = rows[page_size - 1][0] if len(rows) > page_size else None
+    return rows[:page_size], next_after
+
+# ✅ Number of matching quotes, cached until the quotes change
+@instrument()
+def count_quotes(search=None, category=None):
+    key = (search or "", category or "", get_version(QUOTES_VERSION_KEY))
+    count = _count_cache.get(key)
+    if count is None:
+        clauses, params = _quote_filters(search, category)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM motivational_quotes {where}", params)
+            count = cursor.fetchone()[0]
+        _count_cache.set(key, count)
+    return count
+
+# ✅ Delete many quotes in one transaction
+@instrument()
+def delete_quotes(quote_ids):
+    quote_ids = list(quote_ids)
+    if not quote_ids:
+        return 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("DELETE FROM motivational_quotes WHERE id = ?", [(q,) for q in quote_ids])
+        deleted = cursor.rowcount  # Summed over the batch; ids already gone don't count
+    invalidate_quotes()
+    return deleted
+
+# ✅ Bulk import quotes from CSV (category, quote[, weight]) in one transaction
+@instrument()
+def import_quotes_csv(file):
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    if not isinstance(file, io.TextIOBase):
+        file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    rows, rejected = [], []
+    reader = csv.DictReader(file)
+    reader.fieldnames = [name.strip().lower() for name in (reader.fieldnames or [])]
+    for row in reader:
+        category = (row.get("category") or "").strip().lower()
+        quote = (row.get("quote") or "").strip()
+        try:
+            weight = float(row.get("weight") or 1.0)
+        except ValueError:
+            weight = None
+        if category not in QUOTE_CATEGORIES or not quote or weight is None or weight <= 0:
+            rejected.append(reader.line_num)
+            continue
+        rows.append((category, quote, weight))
+
+    if rows:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("INSERT INTO motivational_quotes (category, quote, weight) VALUES (?, ?, ?)", rows)
+        invalidate_quotes()
+    return len(rows), rejected
+
+# ✅ Admin: paginated quote list with search, bulk delete and CSV import
+def quotes_panel():
+    # Add New Quote
+    st.subheader("Add a New Motivational Quote")
+    category = st.selectbox("Select Category", QUOTE_CATEGORIES)
+    quote = st.text_area("Enter Quote")
+
+    if st.button("Add Quote"):
+        add_quote(category, quote)
+        st.success("Quote added successfully!")
+        st.rerun()
+
+    with st.expander("Bulk import (CSV: category, quote, weight)"):
+        uploaded = st.file_uploader("Quotes CSV", type=["csv"])
+        if uploaded is not None and st.button("Import Quotes"):
+            imported, rejected = import_quotes_csv(uploaded)
+            st.success(f"Imported {imported} quotes.")
+            if rejected:
+                st.warning(f"Skipped {len(rejected)} invalid lines: {rejected[:20]}")
+
+    # View Existing Quotes
+    st.subheader("Existing Quotes")
+    col1, col2, col3 = st.columns([3, 2, 1])
+    search = col1.text_input("Search quotes").strip() or None
+    filter_category = col2.selectbox("Category", ["All"] + QUOTE_CATEGORIES)
+    filter_category = None if filter_category == "All" else filter_category
+    page_size = col3.selectbox("Per page", PAGE_SIZES, index=1)
+
+    # Reset to the first page whenever the filters change
+    filters = (search, filter_category, page_size)
+    if st.session_state.get("quote_filters") != filters:
+        st.session_state.quote_filters = filters
+        st.session_state.quote_cursors = [0]
+    cursors = st.session_state.quote_cursors
+
+    rows, next_after = get_quotes_page(cursors[-1], page_size, search, filter_category)
+    total = count_quotes(search, filter_category)
+    st.caption(f"Page {len(cursors)} of {max(1, -(-total // page_size))} · {total} quotes")
+
+    edited = st.data_editor(
+        [{"delete": False, "id": q_id, "category": q_category, "quote": q_text} for q_id, q_category, q_text in rows],
+        column_config={"delete": st.column_config.CheckboxColumn("Delete")},
+        disabled=["id", "category", "quote"],
+        hide_index=True,
+        key=f"quotes_page_{cursors[-1]}",
+    )
+    selected = [row["id"] for row in edited if row["delete"]]
+
+    prev_col, next_col, delete_col = st.columns(3)
+    if prev_col.button("◀ Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next ▶", disabled=next_after is None):
+        cursors.append(next_after)
+        st.rerun()
+    if delete_col.button(f"Delete selected ({len(selected)})", disabled=not selected):
+        deleted = delete_quotes(selected)
+        st.success(f"Deleted {deleted} quotes.")
+        st.rerun()
+
+# ✅ Admin: per-function latency percentiles, call and error counts
+def performance_panel(llm_gateway=None):
+    import pandas as pd
+    from Process.database import get_pool_stats
+    from Process.instrumentation import snapshot, export_json, export_csv, reset_metrics, set_enabled, is_enabled
+
+    st.subheader("Performance")
+    enabled = st.toggle("Record timings", value=is_enabled())
+    if enabled != is_enabled():
+        set_enabled(enabled)
+
+    rows = snapshot()
+    if rows:
+        st.dataframe(pd.DataFrame(rows).set_index("name")[["calls", "errors", "p50_ms", "p95_ms", "p99_ms", "max_ms", "mean_ms"]])
+    else:
+        st.info("No timings recorded yet.")
+
+    st.write("**Connection pool**")
+    st.json(get_pool_stats())
+
+    from Process.recurring import recurring_scheduler_stats
+    scheduler_stats = recurring_scheduler_stats()
+    if scheduler_stats is not None:
+        st.write("**Recurring transactions scheduler**")
+        st.json(scheduler_stats)
+
+    if llm_gateway is not None:
+        st.write("**LLM gateway**")
+        st.json(llm_gateway.stats())
+
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("Export JSON", export_json(), file_name="profi_metrics.json", mime="application/json")
+    col2.download_button("Export CSV", export_csv(), file_name="profi_metrics.csv", mime="text/csv")
+    if col3.button("Reset"):
+        reset_metrics()
+        st.rerun()
+
+# ✅ Admin Panel UI (for the logged-in user in st.session_state["user"]; admins are listed by username)
+def admin_panel(llm_gateway=None):
+    from Process.auth import get_session_user
+    user = get_session_user(st.session_state["user"].get("token")) if "user" in st.session_state else None
+    if user is not None:
+        username = user["username"]
 
         if is_admin(username):
             st.title("Admin Panel - Manage Motivational Quotes")
+            quotes_tab, performance_tab = st.tabs(["Quotes", "Performance"])
+
+            with quotes_tab:
+                quotes_panel()
 
-            # Add New Quote
-            st.subheader("Add a New Motivational Quote")
-            category = st.selectbox("Select Category", ["saving", "budgeting", "debt management", "success"])
-            quote = st.text_area("Enter Quote")
-
-            if st.button("Add Quote"):
-                add_quote(category, quote)
-                st.success("Quote added successfully!")
-                st.experimental_rerun()
-
-            # View Existing Quotes
-            st.subheader("Existing Quotes")
-            quotes = get_motivational_quote()
-            for q_id, q_category, q_text in quotes:
-                st.write(f"📌 **Category:** {q_category}")
-                st.write(f"💬 {q_text}")
-                if st.button(f"Delete Quote {q_id}", key=f"delete_{q_id}"):
-                    delete_quote(q_id)
-                    st.experimental_rerun()  # ✅ Move outside the `if`
+            with performance_tab:
+                performance_panel(llm_gateway)
 
         else:
             st.warning("You are not authorized to access the admin panel.")
     else:
-        st.warning("Please log in first.")
\ No newline at end of file
+        st.warning("Please log in first.")
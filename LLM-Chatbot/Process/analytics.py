@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from Process.cache import TTLCache
+from Process.database import get_db_connection
+from Process.instrumentation import instrument
+from Process.versions import get_version, transactions_version_key
+
+TREND_MONTHS = 12
+ROLLING_WINDOW = 3
+TOP_MOVERS = 5
+
+_cache = TTLCache(maxsize=256, ttl=30 * 60)  # (username, data version, params) -> trends
+
+# ✅ All of a user's expenses in one query, as typed columns
+@instrument()
+def load_transactions(username):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT date, category, amount FROM daily_transactions WHERE username = ? AND type = 'Expense'", (username,))
+        rows = cursor.fetchall()
+
+    if not rows:
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"),
+                             "category": pd.Series(dtype="object"),
+                             "amount": pd.Series(dtype="float64")})
+    dates, categories, amounts = zip(*rows)
+    return pd.DataFrame({
+        "date": pd.to_datetime(pd.Series(dates), format="%Y-%m-%d", errors="coerce"),
+        "category": pd.Series(categories, dtype="object").fillna(""),
+        "amount": pd.to_numeric(pd.Series(amounts), errors="coerce").fillna(0.0),
+    })
+
+# ✅ Month x category spend matrix (months with no spending filled with 0)
+def monthly_matrix(transactions, months=TREND_MONTHS):
+    frame = transactions.dropna(subset=["date"])
+    if frame.empty:
+        return pd.DataFrame()
+
+    month = frame["date"].dt.to_period("M")
+    matrix = frame.groupby([month, frame["category"]], sort=False)["amount"].sum().unstack(fill_value=0.0)
+    last = pd.Timestamp.today().to_period("M")
+    full_range = pd.period_range(end=max(last, matrix.index.max()), periods=months, freq="M")
+    return matrix.reindex(full_range, fill_value=0.0).sort_index(axis=1)
+
+# ✅ Trends: monthly totals, rolling averages, month-over-month deltas and top movers
+def compute_trends(transactions, months=TREND_MONTHS, window=ROLLING_WINDOW, top_n=TOP_MOVERS):
+    monthly = monthly_matrix(transactions, months)
+    if monthly.empty:
+        return {"monthly": monthly, "rolling": monthly, "mom_delta": monthly, "mom_pct": monthly,
+                "top_movers": pd.DataFrame(columns=["category", "previous", "current", "delta", "pct_change"])}
+
+    rolling = monthly.rolling(window, min_periods=1).mean()
+    mom_delta = monthly.diff().fillna(0.0)
+    values = monthly.to_numpy()
+    previous = np.vstack([np.full((1, values.shape[1]), np.nan), values[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(previous > 0, (values - previous) / previous, np.nan)
+    mom_pct = pd.DataFrame(pct, index=monthly.index, columns=monthly.columns)
+
+    # Top movers: biggest absolute change between the last two months
+    current, before = values[-1], values[-2] if len(values) > 1 else np.zeros_like(values[-1])
+    delta = current - before
+    order = np.argsort(-np.abs(delta))[:top_n]
+    order = order[delta[order] != 0]
+    top_movers = pd.DataFrame({
+        "category": monthly.columns.to_numpy()[order],
+        "previous": before[order],
+        "current": current[order],
+        "delta": delta[order],
+        "pct_change": mom_pct.iloc[-1].to_numpy()[order],
+    })
+
+    return {"monthly": monthly, "rolling": rolling, "mom_delta": mom_delta, "mom_pct": mom_pct,
+            "top_movers": top_movers}
+
+# ✅ Cached trends for a user; recomputed only after that user's transactions change
+@instrument()
+def get_expense_trends(username, months=TREND_MONTHS, window=ROLLING_WINDOW, top_n=TOP_MOVERS):
+    key = (username, get_version(transactions_version_key(username)), months, window, top_n)
+    trends = _cache.get(key)
+    if trends is None:
+        trends = compute_trends(load_transactions(username), months, window, top_n)
+        _cache.set(key, trends)
+    return trends
@@ -1,44 +1,57 @@
 import sqlite3
-import bcrypt
 from Process.database import get_db_connection  # ✅ Ensure this exists
+from Process.passwords import hash_password, verify_password, needs_rehash
+from Process.sessions import issue_session_token, validate_session_token
+from Process.instrumentation import instrument
+
+LOGIN_SQL = "SELECT id, name, username, password FROM users WHERE email=?"
 
 # ✅ Register a new user
+# Display names are not unique, so per-user data is keyed on username; registrations use the (unique) email.
+@instrument()
 def register_user(name, email, password, region, currency):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode('utf-8')  # ✅ Ensure utf-8 encoding
+    hashed_password = hash_password(password)  # ✅ Hashed on the bcrypt worker pool
 
     try:
-        cursor.execute("INSERT INTO users (name, email, password, region, currency) VALUES (?, ?, ?, ?, ?)", 
-                       (name, email, hashed_password, region, currency))
-        conn.commit()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO users (username, name, email, password, region, currency) VALUES (?, ?, ?, ?, ?, ?)",
+                           (email, name, email, hashed_password, region, currency))
         return True
     except sqlite3.IntegrityError:
         return False  # Email already exists
-    finally:
-        conn.close()
 
-# ✅ Login function
+# ✅ Login function (returns the user with a signed session token)
+# "username" is the unique key for the user's data; "name" is for display only.
+@instrument()
 def login_user(email, password):
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LOGIN_SQL, (email,))
+        user = cursor.fetchone()
+
+    if not user or not verify_password(password, user[3]):
+        return None
+
+    # ✅ Transparently upgrade hashes made with an old cost factor
+    if needs_rehash(user[3]):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET password=? WHERE id=?", (hash_password(password), user[0]))
 
-    cursor.execute("SELECT id, name, password FROM users WHERE email=?", (email,))
-    user = cursor.fetchone()
+    result = {"id": user[0], "name": user[1], "username": user[2]}
+    result["token"] = issue_session_token(result)
+    return result
 
-    if user and bcrypt.checkpw(password.encode(), user[2].encode()):  # ✅ Ensure password comparison works
-        return {"id": user[0], "name": user[1]}
-    
-    conn.close()
-    return None
+# ✅ Cheap per-rerun session check (no password table lookup)
+def get_session_user(token):
+    return validate_session_token(token)
 
 # ✅ Password reset function
+@instrument()
 def reset_password(email, new_password):
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    hashed_password = hash_password(new_password)
 
-    hashed_password = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode('utf-8')  # ✅ Encode properly
-    cursor.execute("UPDATE users SET password=? WHERE email=?", (hashed_password, email))
-    conn.commit()
-    conn.close()  
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE users SET password=? WHERE email=?", (hashed_password, email))
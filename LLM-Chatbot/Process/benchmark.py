@@ -0,0 +1,167 @@
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date
+
+REGRESSION_THRESHOLD = 0.10  # Flag a case when its median gets >10% slower
+
+# ✅ Benchmark cases: name -> factory(rng, dataset) returning a zero-argument callable
+def _cases(users, anchor_date):
+    from Process import admin, analytics, auth, budget, database, forecasting, motivation, reporting
+    from Process.synthetic_data import BENCHMARK_PASSWORD, QUOTE_CATEGORIES, email_for, username_for
+
+    this_month = anchor_date.replace(day=1)
+    year_start, year_end = this_month.replace(year=this_month.year - 1).isoformat(), this_month.isoformat()
+    return {
+        "budget.get_budget_progress": lambda rng: lambda: budget.get_budget_progress(username_for(rng.randrange(users))),
+        "budget.get_budget_summary": lambda rng: lambda: budget.get_budget_summary(username_for(rng.randrange(users))),
+        "database.get_budget_summary": lambda rng: lambda: database.get_budget_summary(username_for(rng.randrange(users))),
+        "reporting.get_budget_report[year/month]": lambda rng: lambda: reporting.get_budget_report(
+            username_for(rng.randrange(users)), year_start, year_end, "month"),
+        "reporting.get_budget_report[year/week]": lambda rng: lambda: reporting.get_budget_report(
+            username_for(rng.randrange(users)), year_start, year_end, "week"),
+        "auth.login_user": lambda rng: lambda: auth.login_user(email_for(rng.randrange(users)), BENCHMARK_PASSWORD),
+        "motivation.get_motivational_quote": lambda rng: lambda: motivation.get_motivational_quote(rng.choice(QUOTE_CATEGORIES)),
+        "admin.get_motivational_quote": lambda rng: lambda: admin.get_motivational_quote(),
+        "admin.is_admin": lambda rng: lambda: admin.is_admin(username_for(rng.randrange(users))),
+        "analytics.compute_trends": lambda rng: lambda: analytics.compute_trends(
+            analytics.load_transactions(username_for(rng.randrange(users)))),
+        "forecasting.simulate_goals": lambda rng: lambda: (lambda username: forecasting.simulate_goals(
+            forecasting.load_goals(username), *forecasting.load_monthly_flows(username, anchor_date), anchor_date))(
+            username_for(rng.randrange(users))),
+        "analytics.get_expense_trends": lambda rng: lambda: analytics.get_expense_trends(username_for(rng.randrange(users))),
+    }
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def time_case(fn, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "iterations": iterations,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(mean, 4),
+        "p95_ms": round(_percentile(samples, 0.95), 4),
+        "max_ms": round(samples[-1], 4),
+        "ops_per_sec": round(1000 / mean, 1) if mean > 0 else None,
+    }
+
+# ✅ Run every data-access case against a generated database
+def run_benchmarks(db_path, iterations=200, warmup=20, seed=42, only=None, bcrypt_rounds=4):
+    from Process import passwords
+    from Process.database import configure_pool
+
+    configure_pool(db_path)
+    passwords.BCRYPT_ROUNDS = bcrypt_rounds  # Match the dataset so login_user never rehashes
+
+    with sqlite3.connect(db_path) as conn:
+        users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        transactions = conn.execute("SELECT COUNT(*) FROM daily_transactions").fetchone()[0]
+        quotes = conn.execute("SELECT COUNT(*) FROM motivational_quotes").fetchone()[0]
+        latest = conn.execute("SELECT MAX(month) FROM monthly_budget").fetchone()[0]
+    anchor_date = date.fromisoformat(f"{latest}-01") if latest else date.today()  # Date-ranged cases follow the dataset
+
+    results = {}
+    for name, factory in _cases(users, anchor_date).items():
+        if only and not any(part in name for part in only):
+            continue
+        count = iterations if name != "admin.get_motivational_quote" else max(5, iterations // 20)
+        results[name] = time_case(factory(random.Random(seed)), count, min(warmup, count))
+        print(f"  {name:<40} median {results[name]['median_ms']:>10.3f} ms   p95 {results[name]['p95_ms']:>10.3f} ms")
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "seed": seed,
+            "dataset": {"users": users, "transactions": transactions, "quotes": quotes, "anchor_date": anchor_date.isoformat()},
+        },
+        "results": results,
+    }
+
+# ✅ Compare two result files; returns cases whose median slowed down past the threshold
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD):
+    report = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] if before["median_ms"] else 0.0
+        report.append({"case": name, "baseline_ms": before["median_ms"], "current_ms": result["median_ms"],
+                       "change": round(change, 4), "regression": change > threshold})
+    return report
+
+def main(argv=None):
+    from Process.synthetic_data import ANCHOR_DATE, SCALES, generate_dataset
+
+    parser = argparse.ArgumentParser(prog="python -m Process.benchmark", description="ProFi data-access benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="create a synthetic users.db")
+    gen.add_argument("--db", required=True)
+    gen.add_argument("--scale", choices=sorted(SCALES), default="small")
+    gen.add_argument("--users", type=int)
+    gen.add_argument("--transactions", type=int)
+    gen.add_argument("--quotes", type=int)
+    gen.add_argument("--seed", type=int, default=42)
+    gen.add_argument("--bcrypt-rounds", type=int, default=4)
+    gen.add_argument("--anchor-date", type=date.fromisoformat, default=ANCHOR_DATE,
+                     help="date the data ends at (YYYY-MM-DD); pass today's date to exercise current-month views")
+
+    run = commands.add_parser("run", help="time the data-access functions")
+    run.add_argument("--db", required=True)
+    run.add_argument("--iterations", type=int, default=200)
+    run.add_argument("--warmup", type=int, default=20)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--bcrypt-rounds", type=int, default=4)
+    run.add_argument("--only", nargs="*", help="substring filter on case names")
+    run.add_argument("--output", help="write JSON results here")
+    run.add_argument("--compare", help="baseline JSON to check for regressions")
+    run.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        sizes = dict(SCALES[args.scale])
+        sizes.update({k: v for k, v in (("users", args.users), ("transactions", args.transactions),
+                                         ("quotes", args.quotes)) if v is not None})
+        info = generate_dataset(args.db, seed=args.seed, bcrypt_rounds=args.bcrypt_rounds, anchor_date=args.anchor_date, **sizes)
+        print(json.dumps(info, indent=2))
+        return 0
+
+    results = run_benchmarks(args.db, args.iterations, args.warmup, args.seed, args.only, args.bcrypt_rounds)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report = compare_results(baseline, results, args.threshold)
+        for row in report:
+            flag = "❌ REGRESSION" if row["regression"] else "✅"
+            print(f"{flag} {row['case']}: {row['baseline_ms']:.3f} -> {row['current_ms']:.3f} ms ({row['change']:+.1%})")
+        return 1 if any(row["regression"] for row in report) else 0
+
+    if not args.output:
+        print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
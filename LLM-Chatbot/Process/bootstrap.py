@@ -0,0 +1,59 @@
+import threading
+import time
+from Process.database import init_db
+
+_lock = threading.Lock()
+_done = False
+_startup = {}   # phase -> seconds (once per process)
+_reruns = {}    # page -> {"cold_ms", "runs", "total_ms", "last_ms"}
+
+# ✅ Time a one-time startup phase
+def timed_phase(name, fn, *args, **kwargs):
+    started = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _startup[name] = time.perf_counter() - started
+
+# ✅ One-time application setup for this process (schema + migrations, recurring transactions catch-up)
+def bootstrap():
+    global _done
+    if _done:
+        return False
+    with _lock:
+        if _done:
+            return False
+        timed_phase("init_db", init_db)
+        from Process.recurring import start_recurring_scheduler
+        timed_phase("recurring", start_recurring_scheduler)
+        _done = True
+    return True
+
+# ✅ Record how long a page's script run took (first run per page is the cold start)
+def record_rerun(page, seconds):
+    ms = seconds * 1000
+    with _lock:
+        stats = _reruns.get(page)
+        if stats is None:
+            _reruns[page] = {"cold_ms": ms, "runs": 1, "total_ms": ms, "last_ms": ms}
+        else:
+            stats["runs"] += 1
+            stats["total_ms"] += ms
+            stats["last_ms"] = ms
+
+# ✅ Startup phases and per-page cold/warm rerun cost
+def timing_report():
+    with _lock:
+        pages = {}
+        for page, stats in _reruns.items():
+            warm_runs = stats["runs"] - 1
+            pages[page] = {
+                "cold_ms": round(stats["cold_ms"], 1),
+                "warm_avg_ms": round((stats["total_ms"] - stats["cold_ms"]) / warm_runs, 1) if warm_runs else None,
+                "last_ms": round(stats["last_ms"], 1),
+                "runs": stats["runs"],
+            }
+        return {
+            "startup_ms": {phase: round(seconds * 1000, 1) for phase, seconds in _startup.items()},
+            "pages": pages,
+        }
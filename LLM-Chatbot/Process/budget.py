@@ -1,66 +1,31 @@
-import sqlite3
 import streamlit as st
-from datetime import datetime
-
-# ✅ Ensure the budget tables exist
-def create_budget_tables():
-    conn = sqlite3.connect("Process/users.db")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS monthly_budget (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT,
-        month TEXT,
-        category TEXT,
-        planned_amount REAL,
-        UNIQUE(username, month, category)
-    )
-    """)
-
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS daily_transactions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT,
-        date TEXT,
-        category TEXT,
-        amount REAL
-    )
-    """)
-
-    conn.commit()
-    conn.close()
+from datetime import datetime, date
+from Process.database import get_db_connection
+from Process.ledger import (EXPENSE, TRANSACTION_TYPES, delete_transaction, record_transaction, set_planned_amount,
+                            update_planned_amount, update_transaction)
+from Process.reporting import get_budget_report
+from Process.instrumentation import instrument
+
+# ✅ Half-open ISO date bounds [start, end) for a "YYYY-MM" month
+# Dates are stored as ISO "YYYY-MM-DD" text, so range bounds use the (username, date, ...) index
+def month_bounds(month):
+    year, mon = map(int, month.split("-"))
+    start = date(year, mon, 1)
+    end = date(year + 1, 1, 1) if mon == 12 else date(year, mon + 1, 1)
+    return start.isoformat(), end.isoformat()
 
 # ✅ Add a planned budget for the month
+@instrument()
 def add_monthly_budget(username, category, planned_amount):
-    month = datetime.today().strftime("%Y-%m")  # Current month
-    conn = sqlite3.connect("Process/users.db")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    INSERT INTO monthly_budget (username, month, category, planned_amount)
-    VALUES (?, ?, ?, ?)
-    ON CONFLICT(username, month, category) DO UPDATE SET planned_amount = excluded.planned_amount
-    """, (username, month, category, planned_amount))
-
-    conn.commit()
-    conn.close()
+    set_planned_amount(username, category, planned_amount)
+
     st.success(f"Planned amount set for {category}: {planned_amount}")
 
 # ✅ Update monthly budget
+@instrument()
 def update_budget(username, category, new_planned_amount):
-    month = datetime.today().strftime("%Y-%m")  # Current month
-    conn = sqlite3.connect("Process/users.db")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    UPDATE monthly_budget 
-    SET planned_amount = ? 
-    WHERE username = ? AND month = ? AND category = ?
-    """, (new_planned_amount, username, month, category))
-
-    conn.commit()
-    conn.close()
+    update_planned_amount(username, category, new_planned_amount)
+
     st.success(f"Updated planned amount for {category}: {new_planned_amount}")
 
 # ✅ UI: Set monthly budget
@@ -78,53 +43,46 @@ def set_monthly_budget():
         st.warning("Please log in first.")
 
 # ✅ Add a daily income/expense transaction
-def add_daily_transaction(username, category, amount):
+@instrument()
+def add_daily_transaction(username, category, amount, type=EXPENSE):
     date = datetime.today().strftime("%Y-%m-%d")  # Current date
-    conn = sqlite3.connect("Process/users.db")
-    cursor = conn.cursor()
-
-    cursor.execute("INSERT INTO daily_transactions (username, date, category, amount) VALUES (?, ?, ?, ?)", 
-                   (username, date, category, amount))
+    record_transaction(username, category, amount, type, date)
 
-    conn.commit()
-    conn.close()
     st.success(f"Transaction logged: {amount} for {category} on {date}")
 
+# ✅ Edit a logged transaction (rollup moves with it)
+@instrument()
+def update_daily_transaction(username, transaction_id, category=None, amount=None, date=None):
+    return update_transaction(username, transaction_id, category, amount, date)
+
+# ✅ Delete a logged transaction (rollup moves with it)
+@instrument()
+def delete_daily_transaction(username, transaction_id):
+    return delete_transaction(username, transaction_id)
+
 # ✅ UI: Log daily transactions
 def log_daily_amount():
     if "logged_in" in st.session_state and st.session_state.logged_in:
         username = st.session_state.username
         st.subheader("Log Daily Income/Expense")
 
+        type = st.radio("Type", TRANSACTION_TYPES, index=TRANSACTION_TYPES.index(EXPENSE), horizontal=True)
         category = st.text_input("Category (e.g., Salary, Food, Transport)")
         amount = st.number_input("Amount", min_value=0.0, format="%.2f")
 
         if st.button("Log Transaction"):
-            add_daily_transaction(username, category, amount)
+            add_daily_transaction(username, category, amount, type)
     else:
         st.warning("Please log in first.")
 
 # ✅ Fetch budget progress for the current month
+@instrument()
 def get_budget_progress(username):
-    month = datetime.today().strftime("%Y-%m")  # Current month
-    conn = sqlite3.connect("Process/users.db")
-    cursor = conn.cursor()
-
-    # Get planned budget
-    cursor.execute("SELECT category, planned_amount FROM monthly_budget WHERE username = ? AND month = ?", 
-                   (username, month))
-    planned_data = cursor.fetchall()
-
-    # Get actual expenses
-    cursor.execute("""
-    SELECT category, SUM(amount) FROM daily_transactions 
-    WHERE username = ? AND date LIKE ? 
-    GROUP BY category
-    """, (username, f"{month}-%"))
-    
-    actual_data = {row[0]: row[1] for row in cursor.fetchall()}
-    conn.close()
+    start, end = month_bounds(datetime.today().strftime("%Y-%m"))  # Current month
+    report = get_budget_report(username, start, end)
 
+    planned_data = [(row["category"], row["planned"]) for row in report if row["budgeted"]]
+    actual_data = {row["category"]: row["actual"] for row in report if row["transactions"]}
     return planned_data, actual_data
 
 # ✅ UI: Show budget progress
@@ -144,34 +102,34 @@ def show_budget_progress():
     else:
         st.warning("Please log in first.")
 
-# ✅ Get a summary of the current month's budget
-def get_budget_summary(username):
-    month = datetime.today().strftime("%Y-%m")  # Current month
-    conn = sqlite3.connect("Process/users.db")
-    cursor = conn.cursor()
-
-    # Get the total planned budget and actual expenses for each category
-    cursor.execute("""
-    SELECT category, planned_amount FROM monthly_budget WHERE username = ? AND month = ?
-    """, (username, month))
-    planned_data = cursor.fetchall()
-
-    cursor.execute("""
-    SELECT category, SUM(amount) FROM daily_transactions 
-    WHERE username = ? AND date LIKE ? 
-    GROUP BY category
-    """, (username, f"{month}-%"))
-    actual_data = {row[0]: row[1] for row in cursor.fetchall()}
-
+SPENDING_BY_CATEGORY_SQL = """
+SELECT category, SUM(amount) FROM daily_transactions
+WHERE username = ? AND date >= ? AND date < ? AND type = 'Expense'
+GROUP BY category
+"""
+
+# ✅ Spending (expenses) per category over any date range [start_date, end_date)
+@instrument()
+def get_spending_by_category(username, start_date, end_date):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SPENDING_BY_CATEGORY_SQL, (username, str(start_date), str(end_date)))
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+# ✅ Totals for budget progress data (planned vs. spent in budgeted categories)
+def summarize_budget(planned_data, actual_data):
     total_planned = sum([row[1] for row in planned_data])
     total_spent = sum([actual_data.get(row[0], 0) for row in planned_data])
 
-    conn.close()
-
     summary = {
         "total_planned": total_planned,
         "total_spent": total_spent,
         "remaining_budget": total_planned - total_spent
     }
 
-    return summary
\ No newline at end of file
+    return summary
+
+# ✅ Get a summary of the current month's budget
+@instrument()
+def get_budget_summary(username):
+    return summarize_budget(*get_budget_progress(username))
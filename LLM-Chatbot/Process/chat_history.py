@@ -0,0 +1,34 @@
+import os
+from Process.database import get_db_connection
+from Process.instrumentation import instrument
+
+PAGE_TURNS = int(os.environ.get("PROFI_CHAT_PAGE_TURNS", "10"))  # Question/answer pairs per page
+NEWEST = 2 ** 63 - 1  # Above any rowid: "before NEWEST" is the latest page
+
+CHAT_PAGE_SQL = """
+SELECT id, question, bot_response FROM user_interactions
+WHERE username = ? AND id < ?
+ORDER BY id DESC LIMIT ?
+"""
+
+# ✅ user_interactions rows (oldest first) as chat messages
+def to_messages(rows):
+    messages = []
+    for _, question, bot_response in rows:
+        messages.append({"role": "user", "content": question})
+        messages.append({"role": "assistant", "content": bot_response})
+    return messages
+
+# ✅ One page of a user's persisted chat, keyset-paginated on id (no OFFSET, so every page costs the same)
+# Returns (messages oldest first, cursor for the next older page or None when this was the oldest)
+@instrument()
+def get_chat_page(username, before_id=None, turns=PAGE_TURNS):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CHAT_PAGE_SQL, (username, before_id if before_id is not None else NEWEST, turns + 1))
+        rows = cursor.fetchall()
+
+    has_more = len(rows) > turns
+    rows = rows[:turns]
+    rows.reverse()
+    return to_messages(rows), (rows[0][0] if has_more else None)
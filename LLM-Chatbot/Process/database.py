@@ -1,85 +1,241 @@
 import sqlite3
-import bcrypt
 import os
+import queue
+import threading
+import time
+import atexit
+from contextlib import contextmanager
+from Process.passwords import hash_password, verify_password
+from Process.instrumentation import instrument
+from Process.versions import goals_changed
 
-# ✅ Function to connect to SQLite database
-def get_db_connection():
-    db_path = os.path.join(os.getcwd(), "LLM-Chatbot", "Process", "users.db")  # ✅ Use the correct path
+# ✅ Database location (next to this module; override with PROFI_DB_PATH)
+DB_PATH = os.environ.get("PROFI_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.db"))
+POOL_SIZE = int(os.environ.get("PROFI_DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = 30.0  # Seconds to wait for a free connection before giving up
+
+# ✅ Applied once to every connection when it is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",     # Readers don't block the writer
+    "PRAGMA synchronous=NORMAL",   # Safe with WAL, avoids an fsync per commit
+    "PRAGMA busy_timeout=5000",    # Wait up to 5s on a locked database
+    "PRAGMA cache_size=-16000",    # ~16 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+)
+
+# ✅ Bounded pool of long-lived, pre-configured SQLite connections
+class ConnectionPool:
+    def __init__(self, db_path, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # LIFO keeps the warmest connection in use
+        self._lock = threading.Lock()
+        self._all = []
+        self._opened = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout)
+        try:
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        return conn
+
+    def acquire(self):
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+
+        if conn is None:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1  # Reserve the slot before connecting
+            if can_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+                with self._lock:
+                    self._all.append(conn)
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"Timed out after {self.timeout}s waiting for a database connection")
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            if waited > 0.001:
+                self._waits += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn)
 
-    # Debugging: Print database path
-    print(f"🔍 Attempting to connect to: {db_path}")
+    def stats(self):
+        with self._lock:
+            opened = len(self._all)
+            checkouts = self._checkouts
+            return {
+                "db_path": self.db_path,
+                "size": self.size,
+                "open": opened,
+                "idle": self._idle.qsize(),
+                "in_use": opened - self._idle.qsize(),
+                "checkouts": checkouts,
+                "waited_checkouts": self._waits,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": (self._wait_total / checkouts * 1000) if checkouts else 0.0,
+                "max_wait_ms": self._wait_max * 1000,
+            }
 
-    return sqlite3.connect(db_path, check_same_thread=False)
+    def close_all(self):
+        with self._lock:
+            conns, self._all = self._all, []
+            self._opened = 0
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conns:
+            conn.close()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# ✅ Shared pool for the whole process (created on first use)
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+                atexit.register(_pool.close_all)
+    return _pool
+
+# ✅ Point the pool at another database file (benchmarks, scripts)
+def configure_pool(db_path=None, size=None):
+    global _pool, DB_PATH
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        DB_PATH = db_path or DB_PATH
+        _pool = ConnectionPool(DB_PATH, size=size or POOL_SIZE)
+        atexit.register(_pool.close_all)
+    return _pool
+
+# ✅ Borrow a pooled connection: `with get_db_connection() as conn:`
+# Commits when the block exits cleanly, rolls back if it raises.
+def get_db_connection():
+    return get_pool().connection()
+
+# ✅ Pool statistics (checkouts, wait times, open/idle connections)
+def get_pool_stats():
+    return get_pool().stats()
 
 # ✅ Debugging function for database initialization
+@instrument()
 def init_db():
     try:
         # ✅ Ensure 'Process/' folder exists
-        db_folder = os.path.join("LLM-Chatbot", "Process")  # ✅ Corrected variable name
+        db_folder = os.path.dirname(DB_PATH)
         if not os.path.exists(db_folder):
             print("⚠️ 'Process/' folder missing! Creating it now...")
             os.makedirs(db_folder)
 
-        db_path = os.path.join(db_folder, "users.db")
-        if not os.path.exists(db_path):
-            print("⚠️ Database file does NOT exist. It will be created now.")
-            open(db_path, "w").close()  # ✅ Create an empty database file
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+            # ✅ Create Users Table
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE,
+                name TEXT,
+                password TEXT,
+                email TEXT UNIQUE,
+                region TEXT,
+                currency TEXT
+            )
+            """)
+
+            # ✅ Create Financial Goals Table
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS financial_goals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT,
+                goal_name TEXT,
+                target_amount REAL,
+                current_savings REAL DEFAULT 0.0,
+                deadline TEXT
+            )
+            """)
+
+            # ✅ Create User Interactions Table
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS user_interactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT,
+                question TEXT,
+                bot_response TEXT,
+                question_key TEXT,  -- Normalized question + system prompt version (response cache)
+                created_at REAL
+            )
+            """)
+
+            # ✅ Create Admins Table
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS admins (
+                username TEXT PRIMARY KEY  -- Admin username
+            )
+            """)
+
+            # ✅ Create Motivation Table (for mood-based quotes)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS motivational_quotes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                mood_level INTEGER CHECK(mood_level BETWEEN 0 AND 5),  -- 0 = Sad, 5 = Happy
+                category TEXT,
+                quote TEXT
+            )
+            """)
+
+        # ✅ Bring the schema up to date (budget tables, indexes, ...)
+        from Process.migrations import migrate
+        migrate()
 
-        # ✅ Create Users Table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            password TEXT,
-            email TEXT UNIQUE,
-            region TEXT,
-            currency TEXT
-        )
-        """)
-
-        # ✅ Create Financial Goals Table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS financial_goals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT,
-            goal_name TEXT,
-            target_amount REAL,
-            current_savings REAL DEFAULT 0.0,
-            deadline TEXT
-        )
-        """)
-
-        # ✅ Create User Interactions Table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_interactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT,
-            question TEXT,
-            bot_response TEXT
-        )
-        """)
-
-        # ✅ Create Admins Table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS admins (
-            username TEXT PRIMARY KEY  -- Admin username
-        )
-        """)
-
-        # ✅ Create Motivation Table (for mood-based quotes)
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS motivational_quotes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            mood_level INTEGER CHECK(mood_level BETWEEN 0 AND 5),  -- 0 = Sad, 5 = Happy
-            quote TEXT
-        )
-        """)
-
-        conn.commit()
-        conn.close()
         print("✅ Database initialized successfully!")
 
     except sqlite3.OperationalError as e:
@@ -93,84 +249,67 @@ if __name__ == "__main__":
     init_db()
 
 # 🚀 Add User
+@instrument()
 def add_user(username, password, email, region, currency):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode('utf-8')  # ✅ Store as string
+    hashed_pw = hash_password(password)  # ✅ Store as string
 
     try:
-        cursor.execute("INSERT INTO users (username, password, email, region, currency) VALUES (?, ?, ?, ?, ?)", 
-                       (username, hashed_pw, email, region, currency))
-        conn.commit()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO users (username, password, email, region, currency) VALUES (?, ?, ?, ?, ?)", 
+                           (username, hashed_pw, email, region, currency))
     except sqlite3.IntegrityError:
         return "Username or email already exists."
-    
-    conn.close()
+
     return "User registered successfully!"
 
+CHECK_USER_SQL = "SELECT password FROM users WHERE username = ?"
+
 # 🚀 Check User Credentials
+@instrument()
 def check_user(username, password):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT password FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
-
-    if user and bcrypt.checkpw(password.encode(), user[0].encode()):  # ✅ Fix password check
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CHECK_USER_SQL, (username,))
+        user = cursor.fetchone()
+
+    if user and verify_password(password, user[0]):  # ✅ Verified on the bcrypt worker pool
         return True
     return False
 
-# 🚀 Add Budget Category
+# 🚀 Add Budget Category (planned Income/Expense amount for this month in the ledger)
+@instrument()
 def add_budget_category(username, category_type, category_name, planned_amount):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("INSERT INTO budget_categories (username, category_type, category_name, planned_amount) VALUES (?, ?, ?, ?)", 
-                   (username, category_type, category_name, planned_amount))
-    conn.commit()
-    conn.close()
+    from Process.ledger import set_planned_amount  # Deferred: the ledger builds on this module
+    set_planned_amount(username, category_name, planned_amount, type=category_type)
 
 # 🚀 Log Income/Expense Transaction
+@instrument()
 def log_transaction(username, category_type, category_name, amount):
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    from Process.ledger import record_transaction
+    return record_transaction(username, category_name, amount, type=category_type)
 
-    cursor.execute("INSERT INTO transactions (username, category_type, category_name, amount) VALUES (?, ?, ?, ?)", 
-                   (username, category_type, category_name, amount))
-    conn.commit()
-    conn.close()
-
-# 🚀 Get Budget Summary
+# 🚀 Get Budget Summary (all-time income, expenses and net in one ledger pass)
+@instrument()
 def get_budget_summary(username):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT SUM(amount) FROM transactions WHERE username = ? AND category_type = 'Income'", (username,))
-    total_income = cursor.fetchone()[0] or 0.0
-
-    cursor.execute("SELECT SUM(amount) FROM transactions WHERE username = ? AND category_type = 'Expense'", (username,))
-    total_expenses = cursor.fetchone()[0] or 0.0
-
-    conn.close()
-    return total_income, total_expenses, total_income - total_expenses
+    from Process.ledger import get_ledger_totals
+    totals = get_ledger_totals(username)
+    return totals["income"], totals["expenses"], totals["net"]
 
 # 🚀 Set Financial Goal
+@instrument()
 def add_financial_goal(username, goal_name, target_amount, deadline):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("INSERT INTO financial_goals (username, goal_name, target_amount, deadline) VALUES (?, ?, ?, ?)", 
-                   (username, goal_name, target_amount, deadline))
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO financial_goals (username, goal_name, target_amount, deadline) VALUES (?, ?, ?, ?)", 
+                       (username, goal_name, target_amount, deadline))
+    goals_changed(username)
 
 # 🚀 Track Savings
+@instrument()
 def update_savings(username, goal_name, amount):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE financial_goals SET current_savings = current_savings + ? WHERE username = ? AND goal_name = ?", 
-                   (amount, username, goal_name))
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE financial_goals SET current_savings = current_savings + ? WHERE username = ? AND goal_name = ?", 
+                       (amount, username, goal_name))
+    goals_changed(username)
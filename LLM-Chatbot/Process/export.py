@@ -0,0 +1,220 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from Process.database import get_db_connection
+from Process.instrumentation import instrument
+
+EXPORT_BATCH_SIZE = 5000   # Rows per fetchmany() / CSV flush / Parquet row group
+FORMATS = ("csv", "parquet")
+
+# ✅ Exportable tables: column -> Parquet type ("int", "float", "str")
+# Incremental exports use the AUTOINCREMENT id as the watermark, so they pick up new rows;
+# rows edited in place (budget upserts, savings updates) are only refreshed by a full export.
+EXPORT_TABLES = {
+    "daily_transactions": {"id": "int", "username": "str", "date": "str", "category": "str",
+                           "amount": "float", "type": "str"},
+    "monthly_budget": {"id": "int", "username": "str", "month": "str", "category": "str",
+                       "planned_amount": "float", "type": "str"},
+    "financial_goals": {"id": "int", "username": "str", "goal_name": "str", "target_amount": "float",
+                        "current_savings": "float", "deadline": "str"},
+    "user_interactions": {"id": "int", "username": "str", "question": "str", "bot_response": "str",
+                          "question_key": "str", "created_at": "float"},
+}
+
+# ✅ CSV writer: header once, rows appended batch by batch
+class CsvExportWriter:
+    def __init__(self, path, columns):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write_batch(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+# ✅ Parquet writer: one row group per batch (needs pyarrow)
+class ParquetExportWriter:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from None
+
+        types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string()}
+        self._pa = pa
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns.items()])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="snappy")
+
+    def write_batch(self, rows):
+        columns = list(zip(*rows))
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+            schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+# ✅ File name stem for a (table, user) export: usernames are arbitrary text (emails, "Ana/Bo"), so keep only
+# safe characters and add a checksum of the raw name so distinct users never share a file
+def export_stem(table, username=None):
+    if not username:
+        return table
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", username)[:64]
+    return f"{table}-{safe}-{zlib.crc32(username.encode()):08x}"
+
+def open_writer(path, file_format, columns):
+    if file_format == "parquet":
+        return ParquetExportWriter(path, columns)
+    return CsvExportWriter(path, list(columns))
+
+# ✅ Batch query for a table: rows after an id watermark (optionally one user's), in id order
+def batch_query(table, per_user=False):
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"unknown export table {table!r}")
+    columns = ", ".join(EXPORT_TABLES[table])
+    return f"SELECT {columns} FROM {table} WHERE id > ?" + (" AND username = ?" if per_user else "") + " ORDER BY id"
+
+# ✅ Stream a table in id order from one cursor (one read snapshot; memory bounded by the batch size)
+def iter_batches(table, username=None, since=0, batch_size=EXPORT_BATCH_SIZE):
+    sql = batch_query(table, per_user=username is not None)
+    params = [since] if username is None else [since, username]
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+# ✅ Export one table to out_dir; returns a report including the new watermark (highest exported id)
+@instrument()
+def export_table(table, out_dir, file_format="csv", username=None, since=0, batch_size=EXPORT_BATCH_SIZE):
+    if file_format not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+
+    stem = export_stem(table, username)
+    partial = os.path.join(out_dir, f".{stem}.partial")
+    report = {"table": table, "rows": 0, "batches": 0, "since": since, "watermark": since, "path": None,
+              "bytes": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+    started = time.perf_counter()
+
+    writer = None
+    try:
+        for rows in iter_batches(table, username, since, batch_size):
+            if writer is None:
+                writer = open_writer(partial, file_format, EXPORT_TABLES[table])
+            writer.write_batch(rows)
+            report["rows"] += len(rows)
+            report["batches"] += 1
+            report["watermark"] = rows[-1][0]
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(partial)
+        raise
+    if writer is not None:
+        writer.close()
+
+    # Only files with rows are kept, named by the id range they cover
+    if writer is not None:
+        path = os.path.join(out_dir, f"{stem}.{since + 1}-{report['watermark']}.{file_format}")
+        os.replace(partial, path)
+        report["path"] = path
+        report["bytes"] = os.path.getsize(path)
+
+    report["seconds"] = time.perf_counter() - started
+    report["rows_per_sec"] = report["rows"] / report["seconds"] if report["seconds"] > 0 else 0.0
+    return report
+
+def _state_key(table, username):
+    return f"{table}:{username}" if username else table
+
+# ✅ Export every table (one user, or the whole database); `state` maps table -> last exported id
+def export_all(out_dir, file_format="csv", username=None, state=None, tables=None, batch_size=EXPORT_BATCH_SIZE):
+    os.makedirs(out_dir, exist_ok=True)
+    state = dict(state or {})
+    started = time.perf_counter()
+    reports = []
+    for table in tables or EXPORT_TABLES:
+        key = _state_key(table, username)
+        report = export_table(table, out_dir, file_format, username, state.get(key, 0), batch_size)
+        state[key] = report["watermark"]
+        reports.append(report)
+
+    seconds = time.perf_counter() - started
+    rows = sum(r["rows"] for r in reports)
+    size = sum(r["bytes"] for r in reports)
+    return {
+        "tables": reports,
+        "rows": rows,
+        "bytes": size,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else 0.0,
+        "mb_per_sec": size / seconds / 1e6 if seconds > 0 else 0.0,
+        "state": state,
+    }
+
+# ✅ One user's full export as a zip archive (for "download my data")
+def export_user_archive(username, file_format="csv"):
+    import io
+    import tempfile
+    import zipfile
+
+    buffer = io.BytesIO()
+    with tempfile.TemporaryDirectory() as out_dir:
+        result = export_all(out_dir, file_format, username)
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for report in result["tables"]:
+                if report["path"]:
+                    archive.write(report["path"], f"{report['table']}.{file_format}")
+    return buffer.getvalue()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Process.export", description="Export ProFi data to CSV/Parquet")
+    parser.add_argument("out_dir")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--user", help="export only this user's rows")
+    parser.add_argument("--tables", nargs="*", choices=sorted(EXPORT_TABLES))
+    parser.add_argument("--since", type=int, default=0, help="export rows with id above this (all tables)")
+    parser.add_argument("--state", help="JSON file of per-table watermarks; read before and updated after the export")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    parser.add_argument("--db", help="database file (defaults to PROFI_DB_PATH / users.db)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        from Process.database import configure_pool
+        configure_pool(args.db)
+
+    tables = args.tables or list(EXPORT_TABLES)
+    state = {_state_key(table, args.user): args.since for table in tables} if args.since else {}
+    if args.state and os.path.exists(args.state):
+        with open(args.state) as f:
+            state.update(json.load(f))
+
+    result = export_all(args.out_dir, args.format, args.user, state, tables, args.batch_size)
+    for r in result["tables"]:
+        if not r["rows"]:
+            print(f"✅ {r['table']}: no rows after id {r['since']}")
+            continue
+        print(f"✅ {r['table']}: {r['rows']} rows in {r['batches']} batches, ids {r['since'] + 1}-{r['watermark']}"
+              f" -> {r['path']} ({r['rows_per_sec']:.0f} rows/sec)")
+    print(f"Total: {result['rows']} rows, {result['bytes'] / 1e6:.1f} MB in {result['seconds']:.2f}s "
+          f"({result['rows_per_sec']:.0f} rows/sec, {result['mb_per_sec']:.1f} MB/sec)")
+
+    if args.state:
+        with open(args.state, "w") as f:
+            json.dump(result["state"], f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+DEFAULT_REPLY = "Nice work keeping an eye on your budget! Small, steady savings add up faster than you think. 💪"
+
+# ✅ Local stand-in for the Groq chat completions API (streaming and non-streaming)
+# Point the SDK at it with GROQ_BASE_URL=http://127.0.0.1:<port>; latency, errors and
+# rate limiting are configurable so the LLM gateway can be load-tested offline.
+class FakeGroqServer:
+    def __init__(self, host="127.0.0.1", port=0, ttft=0.05, token_delay=0.005, error_rate=0.0,
+                 rate_limit_rate=0.0, max_concurrent=None, reply=DEFAULT_REPLY, seed=None):
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrent = max_concurrent
+        self.reply = reply
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "streamed": 0, "rate_limited": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-groq", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # Decide the outcome of one request: None (serve it), 429 or 500
+    def _admit(self):
+        with self._lock:
+            self._stats["requests"] += 1
+            roll = self._rng.random()
+            if self.max_concurrent is not None and self._stats["in_flight"] >= self.max_concurrent:
+                self._stats["rate_limited"] += 1
+                return 429
+            if roll < self.rate_limit_rate:
+                self._stats["rate_limited"] += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self._stats["errors"] += 1
+                return 500
+            self._stats["in_flight"] += 1
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._stats["in_flight"])
+            return None
+
+    def _finish(self):
+        with self._lock:
+            self._stats["in_flight"] -= 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status, body, headers=()):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path != COMPLETIONS_PATH:
+                    return self._json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+                outcome = server._admit()
+                if outcome == 429:
+                    return self._json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                                      headers=[("Retry-After", "0.1")])
+                if outcome == 500:
+                    return self._json(500, {"error": {"message": "Internal server error", "type": "internal_error"}})
+
+                try:
+                    if body.get("stream"):
+                        self._stream(body)
+                    else:
+                        self._complete(body)
+                finally:
+                    server._finish()
+
+            def _words(self, body):
+                words = server.reply.split(" ")
+                return [word if i == 0 else " " + word for i, word in enumerate(words)][:body.get("max_tokens") or None]
+
+            def _usage(self, body, completion_tokens):
+                prompt_tokens = sum(len(str(m.get("content", ""))) // 4 for m in body.get("messages", []))
+                return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens}
+
+            def _complete(self, body):
+                words = self._words(body)
+                time.sleep(server.ttft + server.token_delay * len(words))
+                self._json(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(words)},
+                                 "finish_reason": "stop"}],
+                    "usage": self._usage(body, len(words)),
+                })
+
+            def _event(self, data):
+                self.wfile.write(f"data: {data}\n\n".encode())
+                self.wfile.flush()
+
+            def _stream(self, body):
+                with server._lock:
+                    server._stats["streamed"] += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": body.get("model", "fake")}
+                words = self._words(body)
+                time.sleep(server.ttft)
+                for i, word in enumerate(words):
+                    delta = {"role": "assistant", "content": word} if i == 0 else {"content": word}
+                    self._event(json.dumps({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}))
+                    if server.token_delay:
+                        time.sleep(server.token_delay)
+                self._event(json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                                        "x_groq": {"id": "req-fake", "usage": self._usage(body, len(words))}}))
+                self._event("[DONE]")
+
+        return Handler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Process.fake_groq", description="Local fake Groq API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", type=float, default=0.05, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="seconds between tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--max-concurrent", type=int, help="answer 429 beyond this many in-flight requests")
+    args = parser.parse_args(argv)
+
+    server = FakeGroqServer(args.host, args.port, args.ttft, args.token_delay, args.error_rate,
+                            args.rate_limit_rate, args.max_concurrent)
+    print(f"Fake Groq listening on {server.base_url} (set GROQ_BASE_URL to use it)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from datetime import datetime
+from Process.budget import get_budget_progress, month_bounds, summarize_budget
+from Process.cache import TTLCache
+from Process.database import get_db_connection
+from Process.history import estimate_tokens
+from Process.instrumentation import instrument
+from Process.ledger import get_ledger_totals
+from Process.versions import budget_version_key, get_version, goals_version_key, transactions_version_key
+
+CONTEXT_TOKEN_BUDGET = 200   # Cap on the snapshot prepended to every LLM request
+TOP_CATEGORIES = 5
+MAX_GOALS = 3
+CONTEXT_TTL = 15 * 60        # Also expire now and then, in case another process wrote the data
+
+_cache = TTLCache(maxsize=1024, ttl=CONTEXT_TTL)
+
+def _money(amount):
+    return f"{amount or 0.0:,.2f}"
+
+# Changes whenever the user's transactions, budget or goals change (or the month rolls over)
+def context_version(username):
+    return (datetime.today().strftime("%Y-%m"),
+            get_version(transactions_version_key(username)),
+            get_version(budget_version_key(username)),
+            get_version(goals_version_key(username)))
+
+@instrument()
+def get_goals(username, limit=MAX_GOALS):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT goal_name, target_amount, current_savings, deadline FROM financial_goals
+        WHERE username = ? ORDER BY deadline IS NULL, deadline LIMIT ?
+        """, (username, limit))
+        return cursor.fetchall()
+
+# ✅ Compact snapshot of the user's month and goals, most important lines first, capped to a token budget
+@instrument()
+def build_financial_context(username, token_budget=CONTEXT_TOKEN_BUDGET):
+    planned_data, actual_data = get_budget_progress(username)
+    summary = summarize_budget(planned_data, actual_data)
+    totals = get_ledger_totals(username, *month_bounds(datetime.today().strftime("%Y-%m")))
+    goals = get_goals(username)
+    if not (planned_data or actual_data or totals["transactions"] or goals):
+        return ""
+
+    lines = [f"The user's financial snapshot for {datetime.today().strftime('%B %Y')} "
+             "(use it to personalise answers; don't recite it unprompted):"]
+    if planned_data or actual_data:
+        lines.append(f"- Month budget: planned {_money(summary['total_planned'])}, "
+                     f"spent {_money(summary['total_spent'])}, remaining {_money(summary['remaining_budget'])}")
+    if totals["transactions"]:
+        lines.append(f"- Month so far: income {_money(totals['income'])}, expenses {_money(totals['expenses'])}, "
+                     f"net {_money(totals['net'])}")
+
+    planned = dict(planned_data)
+    categories = sorted(planned.keys() | actual_data.keys(), key=lambda c: (-actual_data.get(c, 0.0), c))
+    if categories:
+        top = [f"{c or 'Uncategorised'} {_money(actual_data.get(c))}" + (f"/{_money(planned[c])}" if c in planned else "")
+               for c in categories[:TOP_CATEGORIES]]
+        lines.append("- Top categories (spent/planned): " + "; ".join(top))
+
+    for goal_name, target, saved, deadline in goals:
+        lines.append(f"- Goal '{goal_name}': saved {_money(saved)} of {_money(target)}"
+                     + (f" by {deadline}" if deadline else ""))
+
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept) if len(kept) > 1 else ""
+
+# ✅ Cached per user; rebuilt only after their data changes, so chat turns add no queries
+def get_financial_context(username):
+    if not username:
+        return ""
+    key = (username, context_version(username))
+    context = _cache.get(key)
+    if context is None:
+        context = build_financial_context(username)
+        _cache.set(key, context)
+    return context
+
+def context_cache_stats():
+    return _cache.stats()
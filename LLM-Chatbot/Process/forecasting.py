@@ -0,0 +1,157 @@
+import zlib
+from datetime import date
+import numpy as np
+from Process.cache import TTLCache
+from Process.database import get_db_connection
+from Process.instrumentation import instrument
+from Process.versions import get_version, goals_version_key, transactions_version_key
+
+SIMULATION_PATHS = 5000
+HISTORY_MONTHS = 24          # Complete months of ledger history used for the savings rate and its variance
+DEFAULT_HORIZON = 24         # Months simulated for goals without a deadline
+MAX_HORIZON = 600            # Cap on simulated months
+MONTHLY_HORIZON = 120        # Months simulated one by one; later steps are yearly (memory is paths x steps floats)
+BANDS = (10, 50, 90)         # Percentile bands returned per month
+DAYS_PER_MONTH = 365.25 / 12
+
+_cache = TTLCache(maxsize=512, ttl=6 * 60 * 60)  # (username, data versions, day, params) -> forecasts
+
+def _month_index(month):
+    year, mon = map(int, month.split("-"))
+    return year * 12 + mon - 1
+
+def _month_start(index):
+    return date(index // 12, index % 12 + 1, 1)
+
+@instrument()
+def load_goals(username):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT goal_name, target_amount, current_savings, deadline FROM financial_goals
+        WHERE username = ? ORDER BY deadline IS NULL, deadline, goal_name
+        """, (username,))
+        return cursor.fetchall()
+
+# ✅ Income and expenses per complete month, oldest first; months without activity count as 0
+@instrument()
+def load_monthly_flows(username, today=None, months=HISTORY_MONTHS):
+    today = today or date.today()
+    current = today.year * 12 + today.month - 1
+    start, end = _month_start(current - months), _month_start(current)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT substr(date, 1, 7),
+               SUM(CASE WHEN type = 'Income' THEN amount ELSE 0.0 END),
+               SUM(CASE WHEN type = 'Expense' THEN amount ELSE 0.0 END)
+        FROM daily_transactions
+        WHERE username = ? AND date >= ? AND date < ?
+        GROUP BY 1
+        """, (username, start.isoformat(), end.isoformat()))
+        rows = cursor.fetchall()
+
+    if not rows:
+        return np.zeros(0), np.zeros(0)
+    index = np.array([_month_index(month) for month, _, _ in rows]) - (current - months)
+    income, expenses = np.zeros(months), np.zeros(months)
+    income[index] = [row[1] or 0.0 for row in rows]
+    expenses[index] = [row[2] or 0.0 for row in rows]
+    first = index.min()  # Ignore the empty months before the user's first transaction
+    return income[first:], expenses[first:]
+
+def months_until(deadline, today):
+    if not deadline:
+        return None
+    try:
+        days = (date.fromisoformat(str(deadline)[:10]) - today).days
+    except ValueError:
+        return None
+    return max(0, int(np.ceil(days / DAYS_PER_MONTH)))
+
+# ✅ Months at which the paths are sampled: monthly up to MONTHLY_HORIZON, then yearly, plus every goal's deadline
+def _time_grid(horizon):
+    last = max(1, int(horizon.max()))
+    grid = set(range(1, min(last, MONTHLY_HORIZON) + 1))
+    grid.update(range(MONTHLY_HORIZON + 12, last + 1, 12))
+    grid.update(int(h) for h in horizon if h > 0)
+    return np.array(sorted(grid))
+
+# ✅ Simulate every goal at once from one set of (paths x steps) cumulative shocks
+# Monthly contributions are the expected rate plus a shock resampled from the user's historical
+# month-to-month variation in net savings. With income on the ledger the expected rate is the
+# historical mean; without it we assume the user saves the required amount ("plan" basis), which says
+# nothing about their odds, so plan-basis forecasts have probability None. Deadlines beyond MAX_HORIZON
+# months are judged at MAX_HORIZON.
+# A goal's savings are saved + expected * months + cumulative shocks, and the shocks are shared by all
+# goals, so percentiles are taken once and shifted per goal instead of materializing goals x paths x months.
+def simulate_goals(goals, income, expenses, today=None, paths=SIMULATION_PATHS, seed=0):
+    today = today or date.today()
+    if not goals:
+        return []
+
+    names = [goal[0] for goal in goals]
+    target = np.array([goal[1] or 0.0 for goal in goals], dtype=float)
+    saved = np.array([goal[2] or 0.0 for goal in goals], dtype=float)
+    months_left = [months_until(goal[3], today) for goal in goals]
+    months = np.array([m if m is not None else DEFAULT_HORIZON for m in months_left])
+    horizon = np.minimum(months, MAX_HORIZON)
+
+    remaining = np.maximum(target - saved, 0.0)
+    required = np.where(months > 0, remaining / np.maximum(months, 1), remaining)
+
+    net = income - expenses
+    has_history = net.size > 0 and income.sum() > 0
+    expected = np.full(len(goals), net.mean()) if has_history else required
+    deviations = net - net.mean() if net.size > 1 else np.zeros(1)
+
+    grid = _time_grid(horizon)
+    gaps = np.diff(grid, prepend=0)
+    monthly = min(int(grid[-1]), MONTHLY_HORIZON)                                # Leading one-month steps
+    rng = np.random.default_rng(seed)
+    shocks = np.empty((paths, len(grid)))
+    shocks[:, :monthly] = rng.choice(deviations, size=(paths, monthly))
+    for step in range(monthly, len(grid)):                                       # Sum of the months in each longer step
+        shocks[:, step] = rng.choice(deviations, size=(paths, gaps[step])).sum(axis=1)
+    np.cumsum(shocks, axis=1, out=shocks)
+
+    columns = np.searchsorted(grid, np.maximum(horizon, 1))
+    at_deadline = (saved + expected * horizon)[:, None] + shocks[:, columns].T   # goals x paths
+    at_deadline = np.where((horizon == 0)[:, None], saved[:, None], at_deadline)
+    probability = (at_deadline >= target[:, None]).mean(axis=1)
+    shock_bands = np.percentile(shocks, BANDS, axis=0)                           # bands x steps
+    final = np.percentile(at_deadline, BANDS, axis=1)                            # bands x goals
+
+    forecasts = []
+    for i, name in enumerate(names):
+        shown = int(np.searchsorted(grid, horizon[i], side="right"))
+        trend = saved[i] + expected[i] * grid[:shown]
+        forecasts.append({
+            "goal_name": name,
+            "target_amount": float(target[i]),
+            "current_savings": float(saved[i]),
+            "deadline": goals[i][3],
+            "months_left": months_left[i],
+            "required_monthly": float(required[i]),
+            "expected_monthly": float(expected[i]),
+            "basis": "history" if has_history else "plan",
+            "probability": float(probability[i]) if has_history else None,
+            "at_deadline": {f"p{p}": float(final[b, i]) for b, p in enumerate(BANDS)},
+            "months": grid[:shown].tolist(),
+            "bands": {f"p{p}": (trend + shock_bands[b, :shown]).round(2).tolist() for b, p in enumerate(BANDS)},
+        })
+    return forecasts
+
+# ✅ Forecasts for all of a user's goals; cached until their transactions or goals change
+@instrument()
+def forecast_goals(username, paths=SIMULATION_PATHS, today=None):
+    today = today or date.today()
+    key = (username, get_version(transactions_version_key(username)), get_version(goals_version_key(username)),
+           today, paths)
+    forecasts = _cache.get(key)
+    if forecasts is None:
+        income, expenses = load_monthly_flows(username, today)
+        seed = zlib.crc32(username.encode())  # Stable bands across reruns for the same data
+        forecasts = simulate_goals(load_goals(username), income, expenses, today, paths, seed)
+        _cache.set(key, forecasts)
+    return forecasts
@@ -0,0 +1,118 @@
+HISTORY_TOKEN_BUDGET = 3000   # Max prompt tokens for system prompt + summary + recent turns
+HISTORY_MAX_TURNS = 10        # Max recent user/assistant pairs sent verbatim
+SUMMARY_TOKEN_BUDGET = 300    # Cap on the running summary of older turns
+LOW_WATER_RATIO = 0.6         # After folding, shrink the window to this share of the budget
+MESSAGE_OVERHEAD_TOKENS = 4   # Role/formatting tokens the API adds per message
+
+# ✅ Rough token estimate (~4 characters per token for English text)
+def estimate_tokens(text):
+    return max(1, len(text) // 4) if text else 0
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+# ✅ Fallback summarizer: keep the most recent lines that fit the summary budget
+def extractive_summary(previous_summary, dropped_messages, token_budget=SUMMARY_TOKEN_BUDGET):
+    lines = [previous_summary] if previous_summary else []
+    lines += [f"{m['role']}: {' '.join(m['content'].split())}" for m in dropped_messages]
+
+    kept, used = [], 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            remaining = (token_budget - used) * 4
+            if remaining > 40:
+                kept.append("…" + line[-remaining:])
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(reversed(kept))
+
+# ✅ Keeps the prompt inside a token budget: system prompt + running summary + last N turns
+class HistoryManager:
+    def __init__(self, token_budget=HISTORY_TOKEN_BUDGET, max_turns=HISTORY_MAX_TURNS,
+                 summary_budget=SUMMARY_TOKEN_BUDGET, summarizer=None):
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.summary_budget = summary_budget
+        self.summarizer = summarizer or extractive_summary
+        self.summary = ""       # Cached summary of everything before the window
+        self.folded = 0         # Number of conversation messages folded into the summary
+        self.summaries_built = 0
+        self.last_prompt_tokens = 0
+
+    def reset(self):
+        self.summary = ""
+        self.folded = 0
+
+    def _summary_message(self):
+        return {"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}
+
+    def _fixed_tokens(self, system_messages):
+        fixed = sum(message_tokens(m) for m in system_messages)
+        if self.summary:
+            fixed += message_tokens(self._summary_message())
+        return fixed
+
+    def _fold(self, conversation, system_messages):
+        pending = conversation[self.folded:]
+        window_budget = self.token_budget - self._fixed_tokens(system_messages) - self.summary_budget
+        pending_tokens = sum(message_tokens(m) for m in pending)
+        turns = sum(1 for m in pending if m["role"] == "user")
+
+        if pending_tokens <= window_budget and turns <= self.max_turns:
+            return
+
+        # Fold down to a low-water mark so the summarizer runs every few turns, not every turn
+        target_tokens = int(window_budget * LOW_WATER_RATIO)
+        target_turns = max(1, int(self.max_turns * LOW_WATER_RATIO))
+        drop = 0
+        while drop < len(pending) - 1 and (pending_tokens > target_tokens or turns > target_turns):
+            pending_tokens -= message_tokens(pending[drop])
+            if pending[drop]["role"] == "user":
+                turns -= 1
+            drop += 1
+
+        # Never start the window on an assistant reply
+        while drop < len(pending) - 1 and pending[drop]["role"] != "user":
+            drop += 1
+
+        if drop == 0:
+            return
+
+        try:
+            summary = self.summarizer(self.summary, pending[:drop])
+        except Exception:
+            summary = extractive_summary(self.summary, pending[:drop], self.summary_budget)
+        if estimate_tokens(summary) > self.summary_budget:
+            summary = summary[-self.summary_budget * 4:]
+        self.summary = summary
+        self.folded += drop
+        self.summaries_built += 1
+
+    # ✅ Messages to send to the LLM for this turn (optional context goes right after the system prompt)
+    def build(self, messages, context=None):
+        system_messages = [m for m in messages[:1] if m["role"] == "system"]
+        conversation = messages[len(system_messages):]
+        if context:
+            system_messages.append({"role": "system", "content": context})
+
+        if self.folded > len(conversation):  # History was cleared
+            self.reset()
+
+        self._fold(conversation, system_messages)
+
+        prompt = list(system_messages)
+        if self.summary:
+            prompt.append(self._summary_message())
+        prompt += conversation[self.folded:]
+        self.last_prompt_tokens = sum(message_tokens(m) for m in prompt)
+        return prompt
+
+    def stats(self):
+        return {
+            "folded_messages": self.folded,
+            "summaries_built": self.summaries_built,
+            "summary_tokens": estimate_tokens(self.summary),
+            "last_prompt_tokens": self.last_prompt_tokens,
+        }
@@ -0,0 +1,204 @@
+import csv
+import io
+import re
+import sys
+import time
+import streamlit as st
+from datetime import datetime
+from itertools import islice
+from Process.database import get_db_connection
+from Process.ledger import EXPENSE, INCOME, insert_entries
+from Process.versions import transactions_changed
+from Process.instrumentation import instrument
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_REJECTS = 100
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d", "%d.%m.%Y", "%Y%m%d")
+
+# Header aliases seen in bank CSV exports (lower-cased)
+DATE_COLUMNS = ("date", "transaction date", "posted date", "booking date", "value date")
+AMOUNT_COLUMNS = ("amount", "value", "transaction amount")
+DEBIT_COLUMNS = ("debit", "withdrawal", "paid out")
+CREDIT_COLUMNS = ("credit", "deposit", "paid in")
+CATEGORY_COLUMNS = ("category",)
+DESCRIPTION_COLUMNS = ("description", "payee", "name", "memo", "details", "narrative")
+
+# ✅ Keyword -> category rules applied to the description when no category column is present
+CATEGORY_RULES = (
+    ("Rent", ("rent", "landlord", "lease")),
+    ("Food", ("grocery", "supermarket", "restaurant", "cafe", "coffee", "pizza", "food")),
+    ("Transport", ("uber", "bolt", "taxi", "fuel", "petrol", "bus", "train", "metro", "parking")),
+    ("Entertainment", ("netflix", "spotify", "cinema", "steam", "game")),
+    ("Utilities", ("electric", "water", "gas bill", "internet", "phone", "airtime")),
+    ("Salary", ("salary", "payroll", "wages")),
+)
+DEFAULT_EXPENSE_CATEGORY = "Uncategorized"
+DEFAULT_INCOME_CATEGORY = "Income"
+
+# ✅ Normalize a statement date to ISO "YYYY-MM-DD"
+def parse_date(value):
+    value = value.strip()
+    if len(value) >= 8 and value[:8].isdigit():  # OFX: YYYYMMDD[HHMMSS[.XXX][TZ]]
+        value = value[:8]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date {value!r}")
+
+def parse_amount(value):
+    cleaned = re.sub(r"[^\d.,\-()]", "", value.strip())
+    negative = cleaned.startswith("(") and cleaned.endswith(")")
+    cleaned = cleaned.strip("()").replace(",", "")
+    if not cleaned:
+        raise ValueError("missing amount")
+    amount = float(cleaned)
+    return -amount if negative else amount
+
+# ✅ Pick a budget category for a statement line
+def map_category(description, amount, category=None):
+    if category and category.strip():
+        return category.strip().title()
+    text = (description or "").lower()
+    for name, keywords in CATEGORY_RULES:
+        if any(keyword in text for keyword in keywords):
+            return name
+    return DEFAULT_INCOME_CATEGORY if amount > 0 else DEFAULT_EXPENSE_CATEGORY
+
+def _pick(row, names):
+    for name in names:
+        if row.get(name) not in (None, ""):
+            return row[name]
+    return None
+
+# ✅ Stream CSV statement lines as (line_no, raw dict)
+# Debit columns are money out whatever sign the bank printed, so they are negated after parsing
+def iter_csv_rows(file):
+    reader = csv.DictReader(file)
+    reader.fieldnames = [name.strip().lower() for name in (reader.fieldnames or [])]
+    for row in reader:
+        amount, debit = _pick(row, AMOUNT_COLUMNS), False
+        if amount is None:
+            amount = _pick(row, DEBIT_COLUMNS)
+            debit = amount is not None
+            if not debit:
+                amount = _pick(row, CREDIT_COLUMNS)
+        yield reader.line_num, {
+            "date": _pick(row, DATE_COLUMNS),
+            "amount": amount,
+            "debit": debit,
+            "category": _pick(row, CATEGORY_COLUMNS),
+            "description": _pick(row, DESCRIPTION_COLUMNS),
+        }
+
+# ✅ Stream OFX <STMTTRN> blocks (SGML or XML flavour) as (line_no, raw dict)
+def iter_ofx_rows(file):
+    current, start_line = None, 0
+    for line_no, line in enumerate(file, start=1):
+        for closing, tag, value in re.findall(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)", line):
+            tag = tag.upper()
+            if tag == "STMTTRN" and not closing:
+                current, start_line = {}, line_no
+            elif tag == "STMTTRN" and current is not None:
+                yield start_line, {
+                    "date": current.get("DTPOSTED"),
+                    "amount": current.get("TRNAMT"),
+                    "category": None,
+                    "description": current.get("NAME") or current.get("MEMO"),
+                }
+                current = None
+            elif current is not None and not closing and value.strip():
+                current[tag] = value.strip()
+
+# ✅ Validate and map raw lines; yields ("ok", record) or ("rejected", (line_no, reason))
+def iter_transactions(username, raw_rows):
+    for line_no, raw in raw_rows:
+        try:
+            if not raw["date"]:
+                raise ValueError("missing date")
+            if raw["amount"] is None:
+                raise ValueError("missing amount")
+            date = parse_date(raw["date"])
+            amount = parse_amount(raw["amount"])
+            if raw.get("debit"):
+                amount = -abs(amount)
+            category = map_category(raw["description"], amount, raw["category"])
+        except ValueError as e:
+            yield "rejected", (line_no, str(e))
+            continue
+        yield "ok", (username, date, category, abs(amount), INCOME if amount > 0 else EXPENSE)
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+# ✅ Import a statement: streaming parse, one transaction + one rollup update per batch
+@instrument()
+def import_transactions(username, file, file_format="csv", batch_size=IMPORT_BATCH_SIZE):
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    if not isinstance(file, io.TextIOBase):
+        file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    parse = iter_ofx_rows if file_format.lower() == "ofx" else iter_csv_rows
+    report = {"imported": 0, "rejected": 0, "batches": 0, "rejects": [], "seconds": 0.0, "rows_per_sec": 0.0}
+    started = time.perf_counter()
+
+    for batch in _batches(iter_transactions(username, parse(file)), batch_size):
+        rows = []
+        for status, item in batch:
+            if status == "ok":
+                rows.append(item)
+            else:
+                report["rejected"] += 1
+                if len(report["rejects"]) < MAX_REPORTED_REJECTS:
+                    report["rejects"].append({"line": item[0], "reason": item[1]})
+        if not rows:
+            continue
+
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            insert_entries(cursor, rows)  # Rollup totals once per batch, same transaction
+        report["imported"] += len(rows)
+        report["batches"] += 1
+        transactions_changed(username)
+
+    report["seconds"] = time.perf_counter() - started
+    report["rows_per_sec"] = report["imported"] / report["seconds"] if report["seconds"] > 0 else 0.0
+    return report
+
+# ✅ UI: Import a bank statement (for the logged-in user in st.session_state["user"])
+def import_statement():
+    from Process.auth import get_session_user
+    user = get_session_user(st.session_state["user"].get("token")) if "user" in st.session_state else None
+    if user is not None:
+        username = user["username"]
+        st.subheader("📥 Import Bank Statement")
+
+        uploaded = st.file_uploader("CSV or OFX statement", type=["csv", "ofx", "qfx"])
+        if uploaded is not None and st.button("Import Transactions"):
+            file_format = "ofx" if uploaded.name.lower().endswith((".ofx", ".qfx")) else "csv"
+            report = import_transactions(username, uploaded, file_format)
+            st.success(f"Imported {report['imported']} transactions ({report['rows_per_sec']:.0f} rows/sec)")
+            if report["rejected"]:
+                st.warning(f"{report['rejected']} lines were rejected")
+                st.dataframe(report["rejects"])
+    else:
+        st.warning("Please log in first.")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m Process.importer USERNAME FILE [csv|ofx]")
+        sys.exit(2)
+
+    path = sys.argv[2]
+    file_format = sys.argv[3] if len(sys.argv) > 3 else ("ofx" if path.lower().endswith((".ofx", ".qfx")) else "csv")
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        result = import_transactions(sys.argv[1], f, file_format)
+    print(f"✅ Imported {result['imported']} rows in {result['batches']} batches "
+          f"({result['rows_per_sec']:.0f} rows/sec), rejected {result['rejected']}")
+    for reject in result["rejects"]:
+        print(f"   line {reject['line']}: {reject['reason']}")
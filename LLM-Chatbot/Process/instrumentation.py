@@ -0,0 +1,158 @@
+import csv
+import functools
+import inspect
+import io
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# ✅ Latency histogram buckets: 0.01 ms growing 25% per bucket (up to ~7 minutes)
+BUCKET_BOUNDS_MS = [0.01 * (1.25 ** i) for i in range(80)]
+
+_enabled = os.environ.get("PROFI_INSTRUMENTATION", "1") != "0"
+_metrics = {}
+_registry_lock = threading.Lock()
+
+# ✅ Call count, error count and latency histogram for one instrumented function
+class Metric:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, ms, error=False):
+        bucket = bisect_left(BUCKET_BOUNDS_MS, ms)
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            self.buckets[bucket] += 1
+            if ms > self.max_ms:
+                self.max_ms = ms
+            if error:
+                self.errors += 1
+
+    def percentile(self, fraction):
+        with self._lock:
+            target = fraction * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self.buckets):
+                seen += bucket_count
+                if bucket_count and seen >= target:
+                    upper = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+                    return min(upper, self.max_ms)
+        return 0.0
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "calls": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "total_ms": round(self.total_ms, 1),
+        }
+
+def get_metric(name):
+    metric = _metrics.get(name)
+    if metric is None:
+        with _registry_lock:
+            metric = _metrics.setdefault(name, Metric(name))
+    return metric
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+
+def is_enabled():
+    return _enabled
+
+# ✅ Time a block: `with timed("groq.chat"):`
+@contextmanager
+def timed(name):
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        get_metric(name).observe((time.perf_counter() - started) * 1000, error)
+
+# ✅ Decorator recording latency/calls/errors; generators are timed until exhausted
+def instrument(name=None):
+    def decorator(fn):
+        metric_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return (yield from fn(*args, **kwargs))
+                started = time.perf_counter()
+                error = False
+                try:
+                    return (yield from fn(*args, **kwargs))
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    get_metric(metric_name).observe((time.perf_counter() - started) * 1000, error)
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            error = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                get_metric(metric_name).observe((time.perf_counter() - started) * 1000, error)
+        return wrapper
+    return decorator
+
+# ✅ Summary rows for every instrumented function, slowest (by total time) first
+def snapshot():
+    with _registry_lock:
+        metrics = list(_metrics.values())
+    return sorted((m.summary() for m in metrics), key=lambda row: row["total_ms"], reverse=True)
+
+def reset_metrics():
+    with _registry_lock:
+        _metrics.clear()
+
+# ✅ Export for offline analysis (summaries plus raw histogram buckets)
+def export_json():
+    with _registry_lock:
+        metrics = list(_metrics.values())
+    return json.dumps({
+        "exported_at": time.time(),
+        "bucket_bounds_ms": BUCKET_BOUNDS_MS,
+        "metrics": [{**m.summary(), "buckets": list(m.buckets)} for m in metrics],
+    })
+
+def export_csv():
+    rows = snapshot()
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=list(rows[0]) if rows else ["name"])
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
@@ -0,0 +1,112 @@
+import atexit
+import queue
+import threading
+import time
+from Process.database import get_db_connection
+from Process.instrumentation import timed
+
+FLUSH_ROWS = 200          # Flush once this many rows are buffered...
+FLUSH_INTERVAL = 0.5      # ...or once the oldest buffered row is this many seconds old
+BUFFER_SIZE = 10000       # Bounded buffer between the chat thread and the writer
+BLOCK_TIMEOUT = 0.05      # "block" policy: wait at most this long for space, then drop
+
+# ✅ Write-behind queue: callers enqueue rows, a background thread writes them in batches
+class WriteBehindQueue:
+    def __init__(self, insert_sql, flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL,
+                 maxsize=BUFFER_SIZE, policy="block", block_timeout=BLOCK_TIMEOUT, name="write-behind"):
+        if policy not in ("block", "drop"):
+            raise ValueError("policy must be 'block' or 'drop'")
+        self.insert_sql = insert_sql
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0,
+                       "max_batch": 0, "last_flush_ms": 0.0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ✅ Enqueue one row; never touches SQLite on the caller's thread
+    def put(self, row):
+        try:
+            if self.policy == "block":
+                self._queue.put(row, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            return False
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return True
+
+    def _write(self, rows):
+        started = time.perf_counter()
+        try:
+            with timed(f"{self._thread.name}.flush"), get_db_connection() as conn:
+                conn.executemany(self.insert_sql, rows)
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            print(f"❌ Write-behind flush failed ({len(rows)} rows): {e}")
+            return
+        with self._lock:
+            self._stats["written"] += len(rows)
+            self._stats["batches"] += 1
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(rows))
+            self._stats["last_flush_ms"] = (time.perf_counter() - started) * 1000
+
+    def _run(self):
+        batch, deadline = [], None
+        while not (self._stop.is_set() and self._queue.empty()):
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                row = self._queue.get(timeout=timeout)
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(row)
+            except queue.Empty:
+                pass
+
+            if batch and (len(batch) >= self.flush_rows or time.monotonic() >= deadline or self._stop.is_set()):
+                self._write(batch)
+                batch, deadline = [], None
+
+        if batch:
+            self._write(batch)
+
+    # ✅ Drain everything still buffered and stop the writer thread
+    def close(self, timeout=5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "queued": self._queue.qsize()}
+
+_logger = None
+_logger_lock = threading.Lock()
+
+# ✅ Shared interaction logger (started on first use, flushed at shutdown)
+def get_interaction_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = WriteBehindQueue("""
+                INSERT INTO user_interactions (username, question, bot_response, question_key, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """, name="interaction-log")
+                atexit.register(_logger.close)
+    return _logger
+
+# ✅ Persist one chat turn to user_interactions (asynchronously)
+def log_interaction(username, question, bot_response, question_key=None):
+    return get_interaction_logger().put((username, question, bot_response, question_key, time.time()))
+
+def interaction_log_stats():
+    return get_interaction_logger().stats()
@@ -0,0 +1,142 @@
+from datetime import datetime
+from Process.database import get_db_connection
+from Process.rollup import apply_delta, apply_deltas
+from Process.versions import budget_changed, transactions_changed
+from Process.instrumentation import instrument
+
+# ✅ One ledger for every money movement: daily_transactions rows typed Income or Expense,
+# planned amounts in monthly_budget typed the same way. Spending views (rollup, reports,
+# trends) only ever read Expense rows.
+INCOME = "Income"
+EXPENSE = "Expense"
+TRANSACTION_TYPES = (INCOME, EXPENSE)
+
+ALL_TIME = ("0000-01-01", "9999-12-31")
+
+def normalize_type(value):
+    for name in TRANSACTION_TYPES:
+        if str(value).strip().lower() == name.lower():
+            return name
+    raise ValueError(f"transaction type must be one of {TRANSACTION_TYPES}, got {value!r}")
+
+# ✅ Insert (username, date, category, amount, type) rows with the caller's cursor; rollup in the same transaction
+# Rows created by a recurring rule pass their idempotency keys (unique per rule and date) alongside.
+def insert_entries(cursor, rows, recurrence_keys=None):
+    if recurrence_keys is None:
+        cursor.executemany("INSERT INTO daily_transactions (username, date, category, amount, type) VALUES (?, ?, ?, ?, ?)",
+                           rows)
+    else:
+        cursor.executemany("""
+        INSERT INTO daily_transactions (username, date, category, amount, type, recurrence_key) VALUES (?, ?, ?, ?, ?, ?)
+        """, [(*row, key) for row, key in zip(rows, recurrence_keys)])
+    apply_deltas(cursor, [row[:4] for row in rows if row[4] == EXPENSE])
+
+# ✅ Record one transaction (today unless a date is given); returns its id
+@instrument()
+def record_transaction(username, category, amount, type=EXPENSE, date=None):
+    type = normalize_type(type)
+    date = str(date) if date is not None else datetime.today().strftime("%Y-%m-%d")
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO daily_transactions (username, date, category, amount, type) VALUES (?, ?, ?, ?, ?)",
+                       (username, date, category, amount, type))
+        transaction_id = cursor.lastrowid
+        if type == EXPENSE:
+            apply_delta(cursor, username, date, category, amount)  # Same transaction as the insert
+    transactions_changed(username)
+    return transaction_id
+
+# ✅ Edit a transaction (rollup moves with it)
+@instrument()
+def update_transaction(username, transaction_id, category=None, amount=None, date=None, type=None):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT date, category, amount, type FROM daily_transactions WHERE id = ? AND username = ?",
+                       (transaction_id, username))
+        row = cursor.fetchone()
+        if row is None:
+            return False
+
+        old_date, old_category, old_amount, old_type = row
+        new_date = str(date) if date is not None else old_date
+        new_category = category if category is not None else old_category
+        new_amount = amount if amount is not None else old_amount
+        new_type = normalize_type(type) if type is not None else old_type
+
+        cursor.execute("UPDATE daily_transactions SET date = ?, category = ?, amount = ?, type = ? WHERE id = ?",
+                       (new_date, new_category, new_amount, new_type, transaction_id))
+        if old_type == EXPENSE:
+            apply_delta(cursor, username, old_date, old_category, -(old_amount or 0.0), count=-1)
+        if new_type == EXPENSE:
+            apply_delta(cursor, username, new_date, new_category, new_amount)
+    transactions_changed(username)
+    return True
+
+# ✅ Delete a transaction (rollup moves with it)
+@instrument()
+def delete_transaction(username, transaction_id):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT date, category, amount, type FROM daily_transactions WHERE id = ? AND username = ?",
+                       (transaction_id, username))
+        row = cursor.fetchone()
+        if row is None:
+            return False
+
+        cursor.execute("DELETE FROM daily_transactions WHERE id = ?", (transaction_id,))
+        if row[3] == EXPENSE:
+            apply_delta(cursor, username, row[0], row[1], -(row[2] or 0.0), count=-1)
+    transactions_changed(username)
+    return True
+
+# ✅ Set the planned amount for a category (current month unless given)
+@instrument()
+def set_planned_amount(username, category, planned_amount, type=EXPENSE, month=None):
+    type = normalize_type(type)
+    month = month or datetime.today().strftime("%Y-%m")
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT INTO monthly_budget (username, month, category, planned_amount, type)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(username, month, category) DO UPDATE SET
+            planned_amount = excluded.planned_amount,
+            type = excluded.type
+        """, (username, month, category, planned_amount, type))
+    budget_changed(username)
+
+# ✅ Change an existing planned amount; returns False if the category has no plan that month
+@instrument()
+def update_planned_amount(username, category, planned_amount, month=None):
+    month = month or datetime.today().strftime("%Y-%m")
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        UPDATE monthly_budget
+        SET planned_amount = ?
+        WHERE username = ? AND month = ? AND category = ?
+        """, (planned_amount, username, month, category))
+        updated = cursor.rowcount > 0
+    if updated:  # Only a changed row invalidates the user's caches
+        budget_changed(username)
+    return updated
+
+LEDGER_TOTALS_SQL = """
+SELECT COALESCE(SUM(CASE WHEN type = 'Income' THEN amount END), 0.0),
+       COALESCE(SUM(CASE WHEN type = 'Expense' THEN amount END), 0.0),
+       COUNT(*)
+FROM daily_transactions
+WHERE username = ? AND date >= ? AND date < ?
+"""
+
+# ✅ Income, expenses and net for [start_date, end_date) (all time by default) in one SUM(CASE ...) pass
+@instrument()
+def get_ledger_totals(username, start_date=None, end_date=None):
+    start = str(start_date) if start_date is not None else ALL_TIME[0]
+    end = str(end_date) if end_date is not None else ALL_TIME[1]
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LEDGER_TOTALS_SQL, (username, start, end))
+        income, expenses, count = cursor.fetchone()
+
+    return {"income": income, "expenses": expenses, "net": income - expenses, "transactions": count}
@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from Process.instrumentation import get_metric, timed
+
+# ✅ Gateway limits (shared by every session in the process)
+MAX_CONCURRENCY = int(os.environ.get("PROFI_LLM_CONCURRENCY", "8"))     # Requests in flight to Groq at once
+REQUEST_TIMEOUT = float(os.environ.get("PROFI_LLM_TIMEOUT", "30"))      # Deadline per request, retries included
+MAX_RETRIES = int(os.environ.get("PROFI_LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.5   # First retry waits up to this long; doubles per attempt (full jitter)
+BACKOFF_MAX = 8.0
+
+# Raised to callers when a request fails for good (retries exhausted, deadline passed, non-retryable error)
+class LLMGatewayError(RuntimeError):
+    pass
+
+def request_key(request):
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+# 429, 5xx and connection problems are worth retrying; anything else (bad request, auth) is not
+def is_retryable(error):
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    try:
+        import groq
+        return isinstance(error, groq.APIConnectionError)
+    except ImportError:
+        return False
+
+def retry_after(error):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+# ✅ One upstream request; every caller asking the same prompt reads the same chunks
+class _Flight:
+    def __init__(self, key):
+        self.key = key
+        self.chunks = []
+        self.usage = None
+        self.error = None
+        self.done = False
+        self._cond = threading.Condition()
+
+    def push(self, content):
+        with self._cond:
+            self.chunks.append(content)
+            self._cond.notify_all()
+
+    def finish(self, usage=None, error=None):
+        with self._cond:
+            self.usage, self.error, self.done = usage, error, True
+            self._cond.notify_all()
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.chunks) and not self.done:
+                    self._cond.wait()
+                batch = self.chunks[index:]
+                error = self.error if not batch else None
+                if not batch and self.done and error is None:
+                    return
+            if error is not None:
+                raise error
+            index += len(batch)
+            yield from batch
+
+# ✅ A caller's view of a flight: iterate for text chunks, then read usage
+class LLMStream:
+    def __init__(self, flight, coalesced):
+        self._flight = flight
+        self.coalesced = coalesced
+
+    def __iter__(self):
+        return iter(self._flight)
+
+    @property
+    def usage(self):
+        return self._flight.usage
+
+# ✅ Async gateway to Groq: bounded concurrency, deadlines, retries with jitter, prompt coalescing
+# Runs its own event loop on a background thread so Streamlit's sync script threads can share it.
+class LLMGateway:
+    def __init__(self, client_factory, max_concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, coalesce=True):
+        self.client_factory = client_factory
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.coalesce = coalesce
+        self._client = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "coalesced": 0, "completed": 0, "retries": 0, "timeouts": 0, "errors": 0,
+                       "active": 0, "queued": 0, "max_queued": 0}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+
+    # ✅ Start (or join) a streaming chat completion; returns immediately
+    def stream(self, messages, model, max_tokens=300, temperature=1.0, timeout=None):
+        request = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        key = request_key(request)
+        with self._lock:
+            flight = self._in_flight.get(key) if self.coalesce else None
+            if flight is not None:
+                self._stats["coalesced"] += 1
+                return LLMStream(flight, coalesced=True)
+            flight = _Flight(key)
+            self._in_flight[key] = flight
+            self._stats["requests"] += 1
+
+        deadline = time.monotonic() + (timeout or self.timeout)
+        asyncio.run_coroutine_threadsafe(self._run(flight, request, deadline), self._loop)
+        return LLMStream(flight, coalesced=False)
+
+    # ✅ Blocking helper for callers that only need the full text
+    def complete(self, messages, model, max_tokens=300, temperature=1.0, timeout=None):
+        return "".join(self.stream(messages, model, max_tokens, temperature, timeout))
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            self._stats[name] += delta
+            if name == "queued":
+                self._stats["max_queued"] = max(self._stats["max_queued"], self._stats["queued"])
+
+    async def _run(self, flight, request, deadline):
+        usage = error = None
+        try:
+            usage = await self._request_with_retries(flight, request, deadline)
+            self._count("completed")
+        except LLMGatewayError as e:
+            error = e
+        except Exception as e:
+            error = LLMGatewayError(str(e))
+        finally:
+            with self._lock:
+                if self._in_flight.get(flight.key) is flight:
+                    del self._in_flight[flight.key]
+            flight.finish(usage, error)
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        hinted = retry_after(error)
+        return max(delay, hinted) if hinted is not None else delay
+
+    async def _request_with_retries(self, flight, request, deadline):
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                return await asyncio.wait_for(self._attempt(flight, request), remaining)
+            except asyncio.TimeoutError:
+                self._count("timeouts")
+                raise LLMGatewayError(f"LLM request exceeded its {self.timeout:.0f}s deadline") from None
+            except Exception as e:
+                # Once text has reached callers a retry would duplicate it, so only retry before the first chunk
+                delay = self._backoff(attempt, e)
+                if flight.chunks or not is_retryable(e) or attempt >= self.max_retries \
+                        or time.monotonic() + delay >= deadline:
+                    self._count("errors")
+                    raise LLMGatewayError(f"LLM request failed: {e}") from e
+                self._count("retries")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, flight, request):
+        if self._client is None:
+            self._client = self.client_factory()
+
+        self._count("queued")
+        try:
+            with timed("llm.queue_wait"):
+                await self._semaphore.acquire()
+        finally:
+            self._count("queued", -1)
+
+        self._count("active")
+        try:
+            usage = None
+            with timed("llm.request"):
+                response = await self._client.chat.completions.create(**request, stream=True)
+                async with response:
+                    async for chunk in response:
+                        # Groq reports token usage on the final chunk
+                        x_groq = getattr(chunk, "x_groq", None)
+                        if x_groq is not None and getattr(x_groq, "usage", None):
+                            usage = {"prompt_tokens": x_groq.usage.prompt_tokens,
+                                     "completion_tokens": x_groq.usage.completion_tokens}
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            flight.push(chunk.choices[0].delta.content)
+            return usage
+        finally:
+            self._count("active", -1)
+            self._semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            stats = {**self._stats, "in_flight_prompts": len(self._in_flight)}
+        stats["max_concurrency"] = self.max_concurrency
+        stats["queue_wait"] = get_metric("llm.queue_wait").summary()
+        stats["latency"] = get_metric("llm.request").summary()
+        return stats
+
+    def close(self, timeout=5.0):
+        if self._client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result(timeout)
+            except Exception:
+                pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+# ✅ Gateway over the Groq async SDK (GROQ_BASE_URL points it at the fake server for offline tests)
+def create_llm_gateway(api_key=None, base_url=None, **kwargs):
+    def client_factory():
+        from groq import AsyncGroq
+        # Retries and deadlines are handled by the gateway, not the SDK
+        return AsyncGroq(api_key=api_key or os.environ.get("GROQ_API_KEY"),
+                         base_url=base_url or os.environ.get("GROQ_BASE_URL"),
+                         max_retries=0, timeout=kwargs.get("timeout", REQUEST_TIMEOUT))
+    return LLMGateway(client_factory, **kwargs)
+
+# ✅ Offline load test: many client threads against the fake Groq server
+def load_test(requests=200, clients=50, distinct=20, concurrency=MAX_CONCURRENCY, base_url=None,
+              ttft=0.05, token_delay=0.005, error_rate=0.0, rate_limit_rate=0.0, max_concurrent=None, timeout=REQUEST_TIMEOUT):
+    from concurrent.futures import ThreadPoolExecutor
+    from Process.fake_groq import FakeGroqServer
+
+    server = None
+    if base_url is None:
+        server = FakeGroqServer(ttft=ttft, token_delay=token_delay, error_rate=error_rate,
+                                rate_limit_rate=rate_limit_rate, max_concurrent=max_concurrent, seed=7).start()
+        base_url = server.base_url
+    gateway = create_llm_gateway(api_key="fake", base_url=base_url, max_concurrency=concurrency, timeout=timeout)
+
+    def one(i):
+        messages = [{"role": "user", "content": f"Budget question #{i % distinct}"}]
+        started = time.perf_counter()
+        try:
+            gateway.complete(messages, model="llama3-70b-8192")
+            return time.perf_counter() - started, None
+        except LLMGatewayError as e:
+            return time.perf_counter() - started, str(e)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    report = {
+        "requests": requests,
+        "failed": sum(1 for _, error in results if error),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+        "gateway": gateway.stats(),
+        "server": server.stats() if server else None,
+    }
+    gateway.close()
+    if server:
+        server.stop()
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Process.llm_gateway", description="LLM gateway load test")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=50, help="concurrent caller threads")
+    parser.add_argument("--distinct", type=int, default=20, help="distinct prompts (the rest are coalesced)")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="gateway semaphore size")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT)
+    parser.add_argument("--base-url", help="use a running server instead of an in-process fake")
+    parser.add_argument("--ttft", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrent", type=int)
+    args = parser.parse_args(argv)
+
+    report = load_test(args.requests, args.clients, args.distinct, args.concurrency, args.base_url, args.ttft,
+                       args.token_delay, args.error_rate, args.rate_limit_rate, args.max_concurrent, args.timeout)
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+import re
+import sys
+import time
+from Process.database import get_db_connection
+
+# ✅ Add a column to an existing table if an older database lacks it
+def add_column_if_missing(cursor, table, column, declaration):
+    columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+# 🚀 Migration 1: bring older databases up to the schema the code expects
+def _baseline_schema(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS monthly_budget (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT,
+        month TEXT,
+        category TEXT,
+        planned_amount REAL,
+        UNIQUE(username, month, category)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS daily_transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT,
+        date TEXT,
+        category TEXT,
+        amount REAL
+    )
+    """)
+    add_column_if_missing(cursor, "users", "name", "TEXT")                     # register_user stores a display name
+    add_column_if_missing(cursor, "motivational_quotes", "category", "TEXT")   # Quotes are looked up by category
+    add_column_if_missing(cursor, "user_interactions", "question_key", "TEXT")
+    add_column_if_missing(cursor, "user_interactions", "created_at", "REAL")
+
+# 🚀 Migration 2: indexes for the hot read paths
+def _hot_query_indexes(cursor):
+    # Budget progress/summary: per-user month filter, grouped by category, summing amount (covering)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_daily_transactions_user_date_category
+    ON daily_transactions(username, date, category, amount)
+    """)
+    # Planned amounts for a user's month (covering)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_monthly_budget_user_month
+    ON monthly_budget(username, month, category, planned_amount)
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_motivational_quotes_category ON motivational_quotes(category)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_financial_goals_user ON financial_goals(username, goal_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_interactions_question_key ON user_interactions(question_key)")
+
+# 🚀 Migration 3: store every transaction date as ISO "YYYY-MM-DD" so month filters are index range scans
+def _normalize_transaction_dates(cursor):
+    cursor.execute("""
+    UPDATE daily_transactions
+    SET date = date(replace(date, '/', '-'))
+    WHERE date IS NOT NULL
+      AND date(replace(date, '/', '-')) IS NOT NULL
+      AND date != date(replace(date, '/', '-'))
+    """)
+
+# 🚀 Migration 4: per-user monthly category totals, kept in step with daily_transactions
+def _monthly_category_totals(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS monthly_category_totals (
+        username TEXT NOT NULL,
+        month TEXT NOT NULL,       -- "YYYY-MM"
+        category TEXT NOT NULL,
+        total REAL NOT NULL DEFAULT 0.0,
+        txn_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (username, month, category)
+    ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+    INSERT INTO monthly_category_totals (username, month, category, total, txn_count)
+    SELECT username, substr(date, 1, 7), COALESCE(category, ''), COALESCE(SUM(amount), 0.0), COUNT(*)
+    FROM daily_transactions
+    WHERE username IS NOT NULL AND date IS NOT NULL
+    GROUP BY username, substr(date, 1, 7), COALESCE(category, '')
+    """)
+
+# 🚀 Migration 5: optional sampling weight per quote
+def _quote_weights(cursor):
+    add_column_if_missing(cursor, "motivational_quotes", "weight", "REAL DEFAULT 1.0")
+
+# 🚀 Migration 6: every user gets a username (the unique key for their data); registrations never set one
+def _backfill_usernames(cursor):
+    cursor.execute("""
+    UPDATE users SET username = email
+    WHERE username IS NULL AND email IS NOT NULL
+      AND email NOT IN (SELECT username FROM users WHERE username IS NOT NULL)
+    """)
+    cursor.execute("UPDATE users SET username = 'user-' || id WHERE username IS NULL")
+
+# 🚀 Migration 7: unified ledger - typed transactions/plans, covering indexes that include the type
+def _ledger_types(cursor):
+    add_column_if_missing(cursor, "daily_transactions", "type", "TEXT NOT NULL DEFAULT 'Expense'")
+    add_column_if_missing(cursor, "monthly_budget", "type", "TEXT NOT NULL DEFAULT 'Expense'")
+    cursor.execute("DROP INDEX IF EXISTS idx_daily_transactions_user_date_category")
+    cursor.execute("""
+    CREATE INDEX idx_daily_transactions_user_date_category
+    ON daily_transactions(username, date, category, amount, type)
+    """)
+    cursor.execute("DROP INDEX IF EXISTS idx_monthly_budget_user_month")
+    cursor.execute("""
+    CREATE INDEX idx_monthly_budget_user_month
+    ON monthly_budget(username, month, category, planned_amount, type)
+    """)
+
+# 🚀 Migration 8: per-user scans of user_interactions in id order (exports)
+def _interactions_by_user(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_interactions_user ON user_interactions(username)")
+
+# 🚀 Migration 9: recurring transaction rules, and the idempotency key on the transactions they create
+def _recurring_transactions(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS recurring_transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        category TEXT,
+        amount REAL NOT NULL,
+        type TEXT NOT NULL DEFAULT 'Expense',
+        frequency TEXT NOT NULL,           -- daily, weekly, monthly, yearly
+        start_date TEXT NOT NULL,
+        end_date TEXT,                     -- Last possible occurrence (inclusive); NULL = open-ended
+        occurrences INTEGER NOT NULL DEFAULT 0,
+        next_date TEXT NOT NULL,           -- Next occurrence not yet in daily_transactions
+        active INTEGER NOT NULL DEFAULT 1
+    )
+    """)
+    add_column_if_missing(cursor, "daily_transactions", "recurrence_key", "TEXT")  # "<rule id>:<date>"
+    # The scheduler only ever reads active rules that are due, so its cost follows due rules, not users
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_recurring_transactions_due
+    ON recurring_transactions(next_date) WHERE active = 1
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_recurring_transactions_user ON recurring_transactions(username)")
+    cursor.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_transactions_recurrence_key
+    ON daily_transactions(recurrence_key) WHERE recurrence_key IS NOT NULL
+    """)
+
+# ✅ Numbered, forward-only migrations (append new ones; never edit or reorder)
+MIGRATIONS = [
+    (1, "baseline schema for older databases", _baseline_schema),
+    (2, "indexes for hot queries", _hot_query_indexes),
+    (3, "normalize daily_transactions dates to ISO", _normalize_transaction_dates),
+    (4, "monthly_category_totals rollup", _monthly_category_totals),
+    (5, "motivational_quotes.weight", _quote_weights),
+    (6, "backfill users.username", _backfill_usernames),
+    (7, "unified ledger: transaction types", _ledger_types),
+    (8, "user_interactions per-user index", _interactions_by_user),
+    (9, "recurring transaction rules", _recurring_transactions),
+]
+
+# ✅ Hot queries whose plans must use an index (name -> SQL, sample parameters)
+# Built from the modules' own SQL constants and query builders, so the check always sees the real queries.
+def hot_queries():
+    from Process.admin import IS_ADMIN_SQL
+    from Process.auth import LOGIN_SQL
+    from Process.budget import SPENDING_BY_CATEGORY_SQL
+    from Process.chat_history import CHAT_PAGE_SQL, NEWEST, PAGE_TURNS
+    from Process.database import CHECK_USER_SQL
+    from Process.export import batch_query
+    from Process.ledger import ALL_TIME, LEDGER_TOTALS_SQL
+    from Process.recurring import BATCH_RULES, EXISTING_KEYS_SQL, LIST_RULES_SQL, due_rules_query
+    from Process.reporting import build_report_query
+    from Process.response_cache import CACHED_RESPONSE_SQL
+
+    def report(start, end, granularity):
+        return build_report_query(start, end, granularity), {"username": "user", "start": start, "end": end}
+
+    return {
+        "budget.get_budget_progress (reporting, whole month)": report("2026-10-01", "2026-11-01", "month"),
+        "reporting.iter_budget_report (partial month)": report("2026-10-05", "2026-11-01", "month"),
+        "reporting.iter_budget_report (day)": report("2026-10-01", "2026-11-01", "day"),
+        "reporting.iter_budget_report (week)": report("2026-10-01", "2026-11-01", "week"),
+        "budget.get_spending_by_category": (SPENDING_BY_CATEGORY_SQL, ("user", "2026-10-01", "2026-11-01")),
+        "ledger.get_ledger_totals": (LEDGER_TOTALS_SQL, ("user", *ALL_TIME)),
+        "export.iter_batches (user_interactions, per user)": (batch_query("user_interactions", per_user=True), (0, "user")),
+        "chat_history.get_chat_page": (CHAT_PAGE_SQL, ("user", NEWEST, PAGE_TURNS + 1)),
+        "recurring.materialize_due_occurrences (due rules)": (due_rules_query(), ("2026-10-18", BATCH_RULES)),
+        "recurring.materialize_due_occurrences (existing keys)": (EXISTING_KEYS_SQL, ('["1:2026-10-01"]',)),
+        "recurring.list_recurring_rules": (LIST_RULES_SQL, ("user",)),
+        "admin.is_admin": (IS_ADMIN_SQL, ("user",)),
+        "auth.login_user": (LOGIN_SQL, ("user@example.com",)),
+        "database.check_user": (CHECK_USER_SQL, ("user",)),
+        "response_cache.get_cached_response": (CACHED_RESPONSE_SQL, ("key", 0)),
+    }
+
+def _ensure_version_table(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT,
+        applied_at REAL
+    )
+    """)
+
+def get_schema_version():
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        _ensure_version_table(cursor)
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        return cursor.fetchone()[0] or 0
+
+# ✅ Apply pending migrations, each in its own transaction
+def migrate():
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")  # Serialize concurrent startups
+            _ensure_version_table(cursor)
+            cursor.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,))
+            if cursor.fetchone():
+                continue
+            apply(cursor)
+            cursor.execute("INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                           (version, description, time.time()))
+        applied.append(version)
+        print(f"✅ Applied migration {version}: {description}")
+    return applied
+
+SQL_KEYWORDS = {"WHERE", "JOIN", "ON", "GROUP", "ORDER", "LIMIT", "LEFT", "INNER", "UNION", "USING"}
+
+# Names a query's FROM/JOIN clauses give real tables (the table itself and its alias)
+def _table_names(sql, tables):
+    names = set()
+    for table, alias in re.findall(r"(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.IGNORECASE):
+        if table in tables:
+            names.add(table)
+            if alias and alias.upper() not in SQL_KEYWORDS:
+                names.add(alias)
+    return names
+
+# ✅ EXPLAIN QUERY PLAN for every hot query; flags any that scan a whole table
+# (scans of CTEs, subqueries and table-valued functions such as json_each are not table scans)
+def check_query_plans():
+    results = {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for name, (sql, params) in hot_queries().items():
+            plan = [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            scanned_tables = _table_names(sql, tables)
+            full_scans = [step for step in plan if step.startswith("SCAN ") and "USING" not in step
+                          and step.split()[1] in scanned_tables]
+            results[name] = {"plan": plan, "uses_index": not full_scans}
+    return results
+
+if __name__ == "__main__":
+    from Process.database import init_db
+    init_db()
+    print(f"Schema version: {get_schema_version()}")
+
+    if "--check" in sys.argv:
+        failed = False
+        for name, result in check_query_plans().items():
+            status = "✅" if result["uses_index"] else "❌"
+            failed = failed or not result["uses_index"]
+            print(f"{status} {name}: {' | '.join(result['plan'])}")
+        sys.exit(1 if failed else 0)
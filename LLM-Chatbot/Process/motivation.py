@@ -1,26 +1,23 @@
-from database import get_db_connection
-import random
+from Process.database import get_db_connection
+from Process.quote_store import get_quote_store, invalidate_quotes, DEFAULT_QUOTE
+from Process.instrumentation import instrument
 
 # ✅ Add a new motivational quote
-def add_quote(category, quote):
-    conn = get_db_connection()
-    cursor = conn.cursor()
+@instrument()
+def add_quote(category, quote, weight=1.0):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO motivational_quotes (category, quote, weight) VALUES (?, ?, ?)", (category, quote, weight))
+    invalidate_quotes()
 
-    cursor.execute("INSERT INTO motivational_quotes (category, quote) VALUES (?, ?)", (category, quote))
-    conn.commit()
-    conn.close()
-
-# ✅ Fetch a motivational quote based on category
-def get_motivational_quote(category=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    if category:
-        cursor.execute("SELECT quote FROM motivational_quotes WHERE category = ?", (category,))
+# ✅ Fetch a motivational quote based on category (served from the in-memory quote store)
+# Pass a per-session dict as `seen` to avoid repeats until every quote has been shown.
+@instrument()
+def get_motivational_quote(category=None, weighted=False, seen=None):
+    store = get_quote_store()
+    if seen is not None:
+        picked = store.sample_no_repeat(seen, category)
     else:
-        cursor.execute("SELECT quote FROM motivational_quotes")
-
-    quotes = cursor.fetchall()
-    conn.close()
+        picked = store.sample(category, weighted)
 
-    return random.choice(quotes)[0] if quotes else "Keep pushing forward!"
\ No newline at end of file
+    return picked[1] if picked else DEFAULT_QUOTE
@@ -0,0 +1,49 @@
+import os
+import threading
+import bcrypt
+from concurrent.futures import ThreadPoolExecutor
+from Process.instrumentation import instrument
+
+# ✅ bcrypt cost factor (2^rounds iterations); raising it rehashes users at their next login
+BCRYPT_ROUNDS = int(os.environ.get("PROFI_BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.environ.get("PROFI_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_PENDING = HASH_WORKERS * 8   # Callers wait for a slot beyond this many queued hashes
+
+# bcrypt releases the GIL, so a small pool keeps other sessions responsive and caps CPU use
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_slots = threading.BoundedSemaphore(MAX_PENDING)
+
+def _run(fn, *args):
+    _slots.acquire()
+    try:
+        return _executor.submit(fn, *args).result()
+    finally:
+        _slots.release()
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _verify(password, hashed):
+    try:
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+    except ValueError:  # Malformed hash in the database
+        return False
+
+# ✅ Hash a password on the worker pool
+@instrument()
+def hash_password(password, rounds=None):
+    return _run(_hash, password, rounds or BCRYPT_ROUNDS)
+
+# ✅ Check a password against a stored hash on the worker pool
+@instrument()
+def verify_password(password, hashed):
+    if not hashed:
+        return False
+    return _run(_verify, password, hashed)
+
+# ✅ True when a stored hash was made with a different cost factor than BCRYPT_ROUNDS
+def needs_rehash(hashed, rounds=None):
+    try:
+        return int(hashed.split("$")[2]) != (rounds or BCRYPT_ROUNDS)
+    except (IndexError, ValueError):
+        return True
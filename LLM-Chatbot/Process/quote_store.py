@@ -0,0 +1,77 @@
+import random
+import threading
+from bisect import bisect_right
+from itertools import accumulate
+from Process.database import get_db_connection
+from Process.instrumentation import timed
+from Process.versions import bump_version, get_version
+
+QUOTES_VERSION_KEY = "quotes"
+DEFAULT_QUOTE = "Keep pushing forward!"
+
+# ✅ Quotes grouped per category in memory, reloaded only when the quotes version changes
+class QuoteStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._by_category = {}   # category -> (quotes, cumulative weights)
+        self._all = ([], [])
+
+    def _load(self):
+        grouped = {}
+        with timed("quote_store.load"), get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, category, quote, weight FROM motivational_quotes")
+            for quote_id, category, quote, weight in cursor:
+                grouped.setdefault(category, []).append((quote_id, quote, weight if weight and weight > 0 else 1.0))
+
+        by_category = {c: (rows, list(accumulate(r[2] for r in rows))) for c, rows in grouped.items()}
+        all_rows = [row for rows in grouped.values() for row in rows]
+        return by_category, (all_rows, list(accumulate(r[2] for r in all_rows)))
+
+    def _current(self, category):
+        version = get_version(QUOTES_VERSION_KEY)
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._by_category, self._all = self._load()
+                    self._version = version
+        return self._by_category.get(category, ([], [])) if category else self._all
+
+    # ✅ (id, quote) picked uniformly (O(1)) or by weight (O(log n))
+    def sample(self, category=None, weighted=False):
+        rows, cumulative = self._current(category)
+        if not rows:
+            return None
+        if weighted:
+            index = bisect_right(cumulative, random.random() * cumulative[-1])
+            row = rows[min(index, len(rows) - 1)]
+        else:
+            row = rows[random.randrange(len(rows))]
+        return row[0], row[1]
+
+    # ✅ Draw without repeats using a per-session shuffled deck (reshuffled when exhausted)
+    def sample_no_repeat(self, decks, category=None):
+        rows, _ = self._current(category)
+        if not rows:
+            return None
+        deck = decks.get(category)
+        if deck is None or deck[0] != self._version or not deck[1]:
+            order = list(range(len(rows)))
+            random.shuffle(order)
+            deck = decks[category] = (self._version, order)
+        row = rows[deck[1].pop()]
+        return row[0], row[1]
+
+    @property
+    def version(self):
+        return self._version
+
+_store = QuoteStore()
+
+def get_quote_store():
+    return _store
+
+# ✅ Call after any insert/update/delete on motivational_quotes
+def invalidate_quotes():
+    return bump_version(QUOTES_VERSION_KEY)
@@ -0,0 +1,231 @@
+import argparse
+import atexit
+import calendar
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from Process.database import get_db_connection
+from Process.instrumentation import instrument
+from Process.ledger import EXPENSE, insert_entries, normalize_type
+from Process.versions import transactions_changed
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+BATCH_RULES = 500   # Due rules materialized per transaction
+TICK_INTERVAL = float(os.environ.get("PROFI_RECURRING_INTERVAL", "3600"))  # Background tick (seconds); 0 disables it
+
+LIST_RULES_SQL = """
+SELECT id, category, amount, type, frequency, start_date, end_date, next_date, active
+FROM recurring_transactions WHERE username = ? ORDER BY active DESC, next_date
+"""
+
+EXISTING_KEYS_SQL = """
+SELECT d.recurrence_key FROM json_each(?) AS k
+JOIN daily_transactions AS d ON d.recurrence_key = k.value
+"""
+
+# ✅ Due active rules (all users, or one), oldest first; parameters: today, [username,] limit
+def due_rules_query(per_user=False):
+    return ("""
+    SELECT id, username, category, amount, type, frequency, start_date, end_date, occurrences
+    FROM recurring_transactions WHERE active = 1 AND next_date <= ?
+    """ + (" AND username = ?" if per_user else "") + " ORDER BY next_date, id LIMIT ?")
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+# ✅ The index-th occurrence of a rule, always counted from its start date
+# (a rule starting Jan 31 lands on Feb 28 and still returns to Mar 31)
+def occurrence_date(start, frequency, index):
+    if frequency == "daily":
+        return start + timedelta(days=index)
+    if frequency == "weekly":
+        return start + timedelta(weeks=index)
+    months = start.year * 12 + start.month - 1 + index * (12 if frequency == "yearly" else 1)
+    year, month = divmod(months, 12)
+    return date(year, month + 1, min(start.day, calendar.monthrange(year, month + 1)[1]))
+
+def recurrence_key(rule_id, occurrence):
+    return f"{rule_id}:{occurrence.isoformat()}"
+
+# ✅ Add a recurring rule (first occurrence on start_date, today by default); returns its id
+# Occurrences already due are materialized right away.
+@instrument()
+def add_recurring_rule(username, category, amount, frequency, type=EXPENSE, start_date=None, end_date=None):
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"frequency must be one of {FREQUENCIES}, got {frequency!r}")
+    type = normalize_type(type)
+    start = _as_date(start_date) if start_date is not None else date.today()
+    end = _as_date(end_date) if end_date is not None else None
+    if end is not None and end < start:
+        raise ValueError("end_date is before start_date")
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT INTO recurring_transactions (username, category, amount, type, frequency, start_date, end_date, next_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (username, category, amount, type, frequency, start.isoformat(), end and end.isoformat(), start.isoformat()))
+        rule_id = cursor.lastrowid
+
+    if start <= date.today():
+        materialize_due_occurrences(username=username)
+    return rule_id
+
+@instrument()
+def list_recurring_rules(username):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LIST_RULES_SQL, (username,))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+# ✅ Delete a rule; transactions it already created stay on the ledger
+@instrument()
+def delete_recurring_rule(username, rule_id):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM recurring_transactions WHERE id = ? AND username = ?", (rule_id, username))
+        return cursor.rowcount > 0
+
+# ✅ Write every occurrence due by `today` (all users, or one) into daily_transactions
+# Due rules come off a partial index in batches of BATCH_RULES, one transaction per batch: the ledger rows,
+# their rollup deltas and each rule's advanced next_date commit together. The "<rule id>:<date>" key on every
+# row means an occurrence is never written twice, even if a rule's next_date were rewound.
+@instrument()
+def materialize_due_occurrences(today=None, username=None, batch_rules=BATCH_RULES):
+    today = _as_date(today) if today is not None else date.today()
+    report = {"rules": 0, "occurrences": 0, "duplicates": 0, "batches": 0, "users": 0, "seconds": 0.0}
+    started = time.perf_counter()
+    changed_users = set()
+
+    sql = due_rules_query(per_user=username is not None)
+    params = [today.isoformat()] if username is None else [today.isoformat(), username]
+
+    while True:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")  # One scheduler at a time across processes
+            cursor.execute(sql, (*params, batch_rules))
+            due = cursor.fetchall()
+            if not due:
+                break
+
+            rows, keys, updates = [], [], []
+            for rule_id, owner, category, amount, type, frequency, start_date, end_date, index in due:
+                start = _as_date(start_date)
+                last = min(today, _as_date(end_date)) if end_date else today
+                occurrence = occurrence_date(start, frequency, index)
+                while occurrence <= last:
+                    rows.append((owner, occurrence.isoformat(), category, amount, type))
+                    keys.append(recurrence_key(rule_id, occurrence))
+                    index += 1
+                    occurrence = occurrence_date(start, frequency, index)
+                active = end_date is None or occurrence <= _as_date(end_date)
+                updates.append((occurrence.isoformat(), index, int(active), rule_id))
+
+            cursor.execute(EXISTING_KEYS_SQL, (json.dumps(keys),))
+            existing = {row[0] for row in cursor.fetchall()}
+            if existing:
+                rows = [row for row, key in zip(rows, keys) if key not in existing]
+                keys = [key for key in keys if key not in existing]
+
+            insert_entries(cursor, rows, keys)
+            cursor.executemany("UPDATE recurring_transactions SET next_date = ?, occurrences = ?, active = ? WHERE id = ?",
+                               updates)
+
+        batch_users = {row[0] for row in rows}
+        for owner in batch_users:
+            transactions_changed(owner)  # After commit, so caches never rebuild from uncommitted data
+        changed_users |= batch_users
+        report["rules"] += len(due)
+        report["occurrences"] += len(rows)
+        report["duplicates"] += len(existing)
+        report["batches"] += 1
+        if len(due) < batch_rules:
+            break
+
+    report["users"] = len(changed_users)
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+# ✅ Background tick: materializes due occurrences every `interval` seconds
+class RecurringScheduler:
+    def __init__(self, interval=TICK_INTERVAL, name="recurring-scheduler"):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"runs": 0, "occurrences": 0, "errors": 0, "last_run_ms": 0.0, "last_run_at": None}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        if interval > 0:
+            self._thread.start()
+
+    def run_once(self, today=None):
+        report = materialize_due_occurrences(today)
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["occurrences"] += report["occurrences"]
+            self._stats["last_run_ms"] = report["seconds"] * 1000
+            self._stats["last_run_at"] = time.time()
+        return report
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                print(f"❌ Recurring transactions run failed: {e}")
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "interval": self.interval}
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# ✅ Shared scheduler (started on first use, stopped at shutdown)
+def get_recurring_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RecurringScheduler()
+                atexit.register(_scheduler.close)
+    return _scheduler
+
+# ✅ Startup: catch up on everything due now, then keep ticking in the background
+def start_recurring_scheduler():
+    return get_recurring_scheduler().run_once()
+
+def recurring_scheduler_stats():
+    return _scheduler.stats() if _scheduler is not None else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Process.recurring",
+                                     description="Materialize due recurring transactions (e.g. from cron)")
+    parser.add_argument("--today", help="treat this ISO date as today")
+    parser.add_argument("--user", help="only this user's rules")
+    parser.add_argument("--batch-size", type=int, default=BATCH_RULES)
+    parser.add_argument("--db", help="database file (defaults to PROFI_DB_PATH / users.db)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        from Process.database import configure_pool
+        configure_pool(args.db)
+
+    report = materialize_due_occurrences(args.today, args.user, args.batch_size)
+    print(f"✅ {report['occurrences']} occurrences from {report['rules']} due rules for {report['users']} users "
+          f"in {report['batches']} batches ({report['seconds'] * 1000:.1f} ms, {report['duplicates']} already present)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+from datetime import date
+from Process.database import get_db_connection
+from Process.instrumentation import instrument
+
+GRANULARITIES = ("day", "week", "month")
+FETCH_ROWS = 500  # Rows pulled from SQLite per fetchmany() while streaming
+
+# Period label for an ISO date expression: "YYYY-MM-DD" (day), the week's Monday (week), "YYYY-MM" (month)
+PERIOD_SQL = {
+    "day": "{col}",
+    "week": "date({col}, 'weekday 0', '-6 days')",
+    "month": "substr({col}, 1, 7)",
+}
+
+# Planned amounts are monthly, so day/week periods get each day's share (planned / days in that month)
+PLANNED_BY_DAY_SQL = """
+days(d) AS (
+    SELECT date(:start) WHERE date(:start) < date(:end)
+    UNION ALL
+    SELECT date(d, '+1 day') FROM days WHERE date(d, '+1 day') < date(:end)
+),
+planned AS (
+    SELECT {period} AS period, COALESCE(b.category, '') AS category,
+           SUM(b.planned_amount / (julianday(d, 'start of month', '+1 month') - julianday(d, 'start of month'))) AS amount
+    FROM days JOIN monthly_budget b ON b.username = :username AND b.month = substr(d, 1, 7) AND b.type = 'Expense'
+    GROUP BY 1, 2
+)"""
+
+# Month periods: the full planned amount, pro-rated only for months the range cuts through
+PLANNED_BY_MONTH_SQL = """
+planned AS (
+    SELECT month AS period, category,
+           CASE WHEN covered = days THEN planned_amount ELSE planned_amount * covered / days END AS amount
+    FROM (
+        SELECT month, COALESCE(category, '') AS category, planned_amount,
+               julianday(min(:end, date(month || '-01', '+1 month'))) - julianday(max(:start, month || '-01')) AS covered,
+               julianday(date(month || '-01', '+1 month')) - julianday(month || '-01') AS days
+        FROM monthly_budget
+        WHERE username = :username AND month >= substr(:start, 1, 7) AND month <= substr(date(:end, '-1 day'), 1, 7)
+          AND type = 'Expense'
+    )
+    WHERE covered > 0
+)"""
+
+ACTUAL_RAW_SQL = """
+actual AS (
+    SELECT {period} AS period, COALESCE(category, '') AS category, SUM(amount) AS amount, COUNT(*) AS txn_count
+    FROM daily_transactions
+    WHERE username = :username AND date >= :start AND date < :end AND type = 'Expense'
+    GROUP BY 1, 2
+)"""
+
+# Whole months come straight from the maintained (expense-only) rollup
+ACTUAL_ROLLUP_SQL = """
+actual AS (
+    SELECT month AS period, category, total AS amount, txn_count
+    FROM monthly_category_totals
+    WHERE username = :username AND month >= substr(:start, 1, 7) AND month < substr(:end, 1, 7)
+)"""
+
+REPORT_SQL = """
+WITH RECURSIVE {ctes}
+SELECT period, category, SUM(planned), SUM(actual), SUM(txn_count), MAX(budgeted)
+FROM (
+    SELECT period, category, amount AS planned, 0.0 AS actual, 0 AS txn_count, 1 AS budgeted FROM planned
+    UNION ALL
+    SELECT period, category, 0.0, amount, txn_count, 0 FROM actual
+)
+GROUP BY period, category
+ORDER BY period, category
+"""
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+def _is_month_start(iso_date):
+    return iso_date[8:10] == "01"
+
+# ✅ Build the single grouped query for a [start, end) range at the given granularity
+def build_report_query(start, end, granularity="month"):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {GRANULARITIES}")
+
+    if granularity == "month":
+        planned = PLANNED_BY_MONTH_SQL
+    else:
+        planned = PLANNED_BY_DAY_SQL.format(period=PERIOD_SQL[granularity].format(col="d"))
+
+    if granularity == "month" and _is_month_start(start) and _is_month_start(end):
+        actual = ACTUAL_ROLLUP_SQL
+    else:
+        actual = ACTUAL_RAW_SQL.format(period=PERIOD_SQL[granularity].format(col="date"))
+    return REPORT_SQL.format(ctes=f"{planned},{actual}")
+
+# ✅ Stream planned vs. actual per (period, category) for [start_date, end_date), ordered by period
+# Rows are fetched in chunks, so very long ranges never materialize in memory;
+# the pooled connection is held until the iterator is exhausted or closed.
+@instrument()
+def iter_budget_report(username, start_date, end_date, granularity="month", fetch_rows=FETCH_ROWS):
+    start, end = _iso(start_date), _iso(end_date)
+    sql = build_report_query(start, end, granularity)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, {"username": username, "start": start, "end": end})
+        while True:
+            rows = cursor.fetchmany(fetch_rows)
+            if not rows:
+                break
+            for period, category, planned, actual, txn_count, budgeted in rows:
+                yield {
+                    "period": period,
+                    "category": category,
+                    "planned": planned or 0.0,
+                    "actual": actual or 0.0,
+                    "transactions": txn_count or 0,
+                    "budgeted": bool(budgeted),
+                }
+
+# ✅ Whole report as a list (for short ranges and the dashboard)
+def get_budget_report(username, start_date, end_date, granularity="month"):
+    return list(iter_budget_report(username, start_date, end_date, granularity))
@@ -0,0 +1,83 @@
+import hashlib
+import re
+import time
+from Process.cache import TTLCache
+from Process.database import get_db_connection
+from Process.interaction_log import log_interaction
+from Process.instrumentation import instrument
+
+MEMORY_CACHE_SIZE = 512
+MEMORY_TTL = 60 * 60               # 1 hour in process
+PERSISTED_TTL = 7 * 24 * 60 * 60   # Reuse stored answers for up to a week
+
+CACHED_RESPONSE_SQL = """
+SELECT bot_response FROM user_interactions
+WHERE question_key = ? AND created_at >= ?
+ORDER BY id DESC LIMIT 1
+"""
+
+_memory = TTLCache(maxsize=MEMORY_CACHE_SIZE, ttl=MEMORY_TTL)
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+# ✅ Normalize a question so trivial differences share a cache entry
+def normalize_question(question):
+    text = question.lower().strip()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ?!.")
+
+# ✅ Cache key: normalized question + system prompt version
+def question_key(question, prompt_version):
+    return hashlib.sha256(f"{prompt_version}\0{normalize_question(question)}".encode()).hexdigest()
+
+# ✅ Version tag for a system prompt (changes whenever the prompt text changes)
+def prompt_version(system_message):
+    return hashlib.sha256(system_message.encode()).hexdigest()[:12]
+
+# ✅ Only standalone questions are cacheable; earlier turns may change the answer
+def should_use_cache(messages, enabled=True):
+    if not enabled:
+        return False
+    return sum(1 for m in messages if m["role"] == "user") == 1
+
+# ✅ Look up a cached answer: in-process LRU first, then user_interactions
+@instrument()
+def get_cached_response(question, prompt_version):
+    key = question_key(question, prompt_version)
+
+    response = _memory.get(key)
+    if response is not None:
+        _stats["memory_hits"] += 1
+        return response
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CACHED_RESPONSE_SQL, (key, time.time() - PERSISTED_TTL))
+        row = cursor.fetchone()
+
+    if row is None:
+        _stats["misses"] += 1
+        return None
+
+    _stats["db_hits"] += 1
+    _memory.set(key, row[0])
+    return row[0]
+
+# ✅ Remember an answer in memory and persist it as a user interaction (write-behind)
+def store_response(username, question, prompt_version, response):
+    key = question_key(question, prompt_version)
+    _memory.set(key, response)
+    _stats["stores"] += 1
+    log_interaction(username, question, response, key)
+
+# ✅ Hit/miss counters for the response cache
+def cache_stats():
+    lookups = _stats["memory_hits"] + _stats["db_hits"] + _stats["misses"]
+    hits = _stats["memory_hits"] + _stats["db_hits"]
+    return {
+        **_stats,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "memory": _memory.stats(),
+    }
+
+def clear_cache():
+    _memory.clear()
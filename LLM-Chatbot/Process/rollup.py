@@ -0,0 +1,94 @@
+import sys
+from Process.database import get_db_connection
+from Process.instrumentation import instrument
+
+# Raw expense rows grouped the same way as the rollup (month = "YYYY-MM" prefix of the ISO date)
+ROLLUP_SOURCE_SQL = """
+SELECT username, substr(date, 1, 7), COALESCE(category, ''), COALESCE(SUM(amount), 0.0), COUNT(*)
+FROM daily_transactions
+WHERE username IS NOT NULL AND date IS NOT NULL AND type = 'Expense'
+GROUP BY username, substr(date, 1, 7), COALESCE(category, '')
+"""
+
+# ✅ Apply one transaction's change to the rollup using the caller's cursor (same transaction)
+def apply_delta(cursor, username, date, category, amount, count=1):
+    month = str(date)[:7]
+    category = category or ""
+    cursor.execute("""
+    INSERT INTO monthly_category_totals (username, month, category, total, txn_count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(username, month, category) DO UPDATE SET
+        total = total + excluded.total,
+        txn_count = txn_count + excluded.txn_count
+    """, (username, month, category, amount or 0.0, count))
+
+    if count < 0:
+        cursor.execute("""
+        DELETE FROM monthly_category_totals
+        WHERE username = ? AND month = ? AND category = ? AND txn_count <= 0
+        """, (username, month, category))
+
+# ✅ Apply a batch of (username, date, category, amount) rows, pre-aggregated per month/category
+def apply_deltas(cursor, rows):
+    totals = {}
+    for username, date, category, amount in rows:
+        key = (username, str(date)[:7], category or "")
+        total, count = totals.get(key, (0.0, 0))
+        totals[key] = (total + (amount or 0.0), count + 1)
+
+    cursor.executemany("""
+    INSERT INTO monthly_category_totals (username, month, category, total, txn_count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(username, month, category) DO UPDATE SET
+        total = total + excluded.total,
+        txn_count = txn_count + excluded.txn_count
+    """, [(u, m, c, total, count) for (u, m, c), (total, count) in totals.items()])
+
+# ✅ Compare the rollup with a fresh aggregation of the raw rows
+@instrument()
+def verify_rollup(tolerance=0.005):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        expected = {(u, m, c): (total, count) for u, m, c, total, count in cursor.execute(ROLLUP_SOURCE_SQL)}
+        actual = {(u, m, c): (total, count) for u, m, c, total, count in cursor.execute(
+            "SELECT username, month, category, total, txn_count FROM monthly_category_totals")}
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want, got = expected.get(key), actual.get(key)
+        if want is None or got is None or want[1] != got[1] or abs(want[0] - got[0]) > tolerance:
+            mismatches.append({"key": key, "expected": want, "actual": got})
+    return mismatches
+
+# ✅ Recompute the whole rollup from daily_transactions in one transaction
+@instrument()
+def rebuild_rollup(verify=True):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DELETE FROM monthly_category_totals")
+        cursor.execute(f"""
+        INSERT INTO monthly_category_totals (username, month, category, total, txn_count)
+        {ROLLUP_SOURCE_SQL}
+        """)
+        rows = cursor.execute("SELECT COUNT(*) FROM monthly_category_totals").fetchone()[0]
+
+    mismatches = verify_rollup() if verify else []
+    return rows, mismatches
+
+if __name__ == "__main__":
+    from Process.database import init_db
+    init_db()
+
+    if "--rebuild" in sys.argv:
+        rows, mismatches = rebuild_rollup()
+        print(f"✅ Rebuilt monthly_category_totals: {rows} rows")
+    else:
+        mismatches = verify_rollup()
+
+    if mismatches:
+        print(f"❌ {len(mismatches)} rollup rows differ from daily_transactions")
+        for mismatch in mismatches[:20]:
+            print(f"   {mismatch}")
+        sys.exit(1)
+    print("✅ Rollup matches daily_transactions")
@@ -0,0 +1,42 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+SESSION_TTL = 12 * 60 * 60  # Tokens are valid for 12 hours
+
+# Set PROFI_SESSION_SECRET to keep sessions valid across restarts and processes
+_secret = os.environ.get("PROFI_SESSION_SECRET", "").encode() or secrets.token_bytes(32)
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _sign(payload):
+    return _b64encode(hmac.new(_secret, payload.encode(), hashlib.sha256).digest())
+
+# ✅ Issue an HMAC-signed session token for a logged-in user
+def issue_session_token(user, ttl=SESSION_TTL):
+    claims = {"id": user["id"], "name": user["name"], "username": user["username"], "exp": int(time.time()) + ttl}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+# ✅ Validate a session token without touching the database; returns the user or None
+def validate_session_token(token):
+    if not token or "." not in token:
+        return None
+    payload, signature = token.rsplit(".", 1)
+    if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if claims.get("exp", 0) < time.time() or not claims.get("username"):  # Tokens from before usernames: log in again
+        return None
+    return {"id": claims["id"], "name": claims["name"], "username": claims["username"]}
@@ -0,0 +1,105 @@
+import os
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+import bcrypt
+
+BENCHMARK_PASSWORD = "benchmark-password"
+CATEGORIES = ("Food", "Rent", "Transport", "Entertainment", "Utilities", "Salary", "Savings", "Health")
+QUOTE_CATEGORIES = ("saving", "budgeting", "debt management", "success")
+INSERT_CHUNK = 50000
+ANCHOR_DATE = date(2026, 1, 1)  # "Today" for generated data, so a seed always yields the same dates
+
+# ✅ Preset dataset sizes
+SCALES = {
+    "small": {"users": 1000, "transactions": 100000, "quotes": 1000},
+    "medium": {"users": 10000, "transactions": 1000000, "quotes": 10000},
+    "production": {"users": 100000, "transactions": 10000000, "quotes": 50000},
+}
+
+def username_for(i):
+    return f"user{i}"
+
+def email_for(i):
+    return f"user{i}@example.com"
+
+def _chunks(rows, size=INSERT_CHUNK):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# ✅ Generate a reproducible synthetic users.db (schema comes from init_db + migrations)
+def generate_dataset(db_path, users, transactions, quotes, seed=42, years=3, bcrypt_rounds=4, anchor_date=ANCHOR_DATE):
+    from Process.database import configure_pool, init_db
+    from Process.rollup import rebuild_rollup
+
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} already exists")
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    configure_pool(db_path)
+    init_db()
+
+    # One shared hash keeps generation fast; login cost still comes from bcrypt at this cost factor
+    password_hash = bcrypt.hashpw(BENCHMARK_PASSWORD.encode(), bcrypt.gensalt(bcrypt_rounds)).decode('utf-8')
+    today = anchor_date
+    first_day = today - timedelta(days=365 * years)
+    span = (today - first_day).days
+    months = sorted({(first_day + timedelta(days=d)).strftime("%Y-%m") for d in range(0, span + 1, 28)}
+                    | {today.strftime("%Y-%m")})
+
+    # Bulk load on a dedicated connection with durability off; this is a throwaway file
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=OFF")
+    cursor = conn.cursor()
+
+    cursor.executemany(
+        "INSERT INTO users (username, name, password, email, region, currency) VALUES (?, ?, ?, ?, ?, ?)",
+        ((username_for(i), f"User {i}", password_hash, email_for(i), "NG", "NGN") for i in range(users)))
+    cursor.executemany("INSERT INTO admins (username) VALUES (?)",
+                       ((username_for(i),) for i in range(0, users, 100)))
+
+    budgets = ((username_for(u), month, category, round(rng.uniform(50, 1500), 2),
+                "Income" if category == "Salary" else "Expense")
+               for u in range(users) for month in months[-12:]
+               for category in rng.sample(CATEGORIES, 4))
+    for chunk in _chunks(budgets):
+        cursor.executemany(
+            "INSERT OR IGNORE INTO monthly_budget (username, month, category, planned_amount, type) VALUES (?, ?, ?, ?, ?)",
+            chunk)
+
+    txns = ((username_for(rng.randrange(users)),
+             (first_day + timedelta(days=rng.randrange(span + 1))).isoformat(),
+             category,
+             round(rng.expovariate(1 / 40), 2),
+             "Income" if category == "Salary" else "Expense")
+            for category in (rng.choice(CATEGORIES) for _ in range(transactions)))
+    for chunk in _chunks(txns):
+        cursor.executemany("INSERT INTO daily_transactions (username, date, category, amount, type) VALUES (?, ?, ?, ?, ?)",
+                           chunk)
+        conn.commit()
+
+    cursor.executemany(
+        "INSERT INTO financial_goals (username, goal_name, target_amount, current_savings, deadline) VALUES (?, ?, ?, ?, ?)",
+        ((username_for(u), "Emergency fund", 1000.0, round(rng.uniform(0, 800), 2),
+          (today + timedelta(days=rng.randrange(30, 720))).isoformat()) for u in range(users)))
+    cursor.executemany(
+        "INSERT INTO motivational_quotes (category, quote, weight) VALUES (?, ?, ?)",
+        ((rng.choice(QUOTE_CATEGORIES), f"Synthetic quote #{q}: small steps add up.", rng.choice((1.0, 1.0, 2.0)))
+         for q in range(quotes)))
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+    rebuild_rollup(verify=False)
+    return {
+        "db_path": db_path, "seed": seed, "users": users, "transactions": transactions, "quotes": quotes,
+        "bcrypt_rounds": bcrypt_rounds, "anchor_date": anchor_date.isoformat(), "seconds": round(time.perf_counter() - started, 2),
+    }
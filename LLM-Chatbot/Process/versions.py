@@ -0,0 +1,33 @@
+import threading
+
+_versions = {}
+_lock = threading.Lock()
+
+# ✅ In-process data version counters used to invalidate caches (e.g. "quotes", "transactions:alice")
+def bump_version(key):
+    with _lock:
+        _versions[key] = _versions.get(key, 0) + 1
+        return _versions[key]
+
+def get_version(key):
+    return _versions.get(key, 0)
+
+# ✅ Per-user transaction data version (bump after a user's transactions change and commit)
+def transactions_version_key(username):
+    return f"transactions:{username}"
+
+def transactions_changed(username):
+    return bump_version(transactions_version_key(username))
+
+# ✅ Per-user planned budget and savings goal versions (same pattern as transactions)
+def budget_version_key(username):
+    return f"budget:{username}"
+
+def budget_changed(username):
+    return bump_version(budget_version_key(username))
+
+def goals_version_key(username):
+    return f"goals:{username}"
+
+def goals_changed(username):
+    return bump_version(goals_version_key(username))
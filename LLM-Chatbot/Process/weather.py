@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Process.cache import TTLCache
+
+WEATHER_TTL = 10 * 60          # Serve cached weather for 10 minutes
+WEATHER_STALE_TTL = 60 * 60    # After that, serve stale data for up to an hour while refreshing
+ERROR_RETRY_AFTER = 60         # Don't retry a failing city more than once a minute
+FIRST_FETCH_WAIT = 0.3         # Seconds a page render may wait for a city it has never seen
+CONNECT_TIMEOUT = 2.0
+READ_TIMEOUT = 3.0
+MAX_CITIES = 1024              # Cities are free-text input, so cached readings and failures are LRU-bounded
+
+# ✅ OpenWeatherMap backend on a pooled HTTP session with strict timeouts
+class OpenWeatherBackend:
+    url = "https://api.openweathermap.org/data/2.5/weather"
+
+    def __init__(self, api_key, pool_size=4):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.api_key = api_key
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, city):
+        response = self.session.get(
+            self.url,
+            params={"q": city, "appid": self.api_key, "units": "metric"},
+            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        )
+        response.raise_for_status()
+        data = response.json()
+        return {
+            "city": data.get("name", city),
+            "temp_c": data["main"]["temp"],
+            "description": data["weather"][0]["description"] if data.get("weather") else "",
+        }
+
+# ✅ Offline backend with deterministic readings (tests, local development)
+class StubWeatherBackend:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def fetch(self, city):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        seed = sum(ord(c) for c in city.lower())
+        return {"city": city, "temp_c": round(5 + seed % 25 + (seed % 10) / 10, 1), "description": "clear sky"}
+
+# ✅ Per-city TTL cache that serves stale data while refreshing in the background
+class WeatherProvider:
+    def __init__(self, backend, ttl=WEATHER_TTL, stale_ttl=WEATHER_STALE_TTL, max_workers=2, max_cities=MAX_CITIES):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = TTLCache(maxsize=max_cities, ttl=stale_ttl)           # city key -> (fetched_at, data)
+        self._failures = TTLCache(maxsize=max_cities, ttl=ERROR_RETRY_AFTER)  # city key -> time of last failed fetch
+        self._inflight = {}    # city key -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather")
+        self._stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "fetches": 0, "errors": 0}
+
+    def _refresh(self, key, city):
+        try:
+            data = self.backend.fetch(city)
+            with self._lock:
+                self._entries.set(key, (time.monotonic(), data))
+                self._failures.pop(key)
+                self._stats["fetches"] += 1
+            return data
+        except Exception:
+            with self._lock:
+                self._failures.set(key, time.monotonic())
+                self._stats["errors"] += 1
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _schedule(self, key, city):
+        # Caller holds the lock
+        future = self._inflight.get(key)
+        if future is None:
+            if self._failures.get(key) is not None:  # Failed within the last ERROR_RETRY_AFTER seconds
+                return None
+            future = self._executor.submit(self._refresh, key, city)
+            self._inflight[key] = future
+        return future
+
+    # ✅ Cached reading for a city, or None if nothing is available yet
+    def get(self, city, wait=FIRST_FETCH_WAIT):
+        key = city.strip().lower()
+        if not key:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age < self.ttl:
+                    self._stats["fresh_hits"] += 1
+                    return entry[1]
+                if age < self.stale_ttl:
+                    self._stats["stale_hits"] += 1
+                    self._schedule(key, city)
+                    return entry[1]
+            self._stats["misses"] += 1
+            future = self._schedule(key, city)
+
+        if future is None or not wait:
+            return None
+        try:
+            return future.result(timeout=wait)
+        except Exception:
+            return None  # Still loading; the next rerun will pick it up
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "cities": len(self._entries), "inflight": len(self._inflight)}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+# ✅ Build a provider from configuration (PROFI_WEATHER_BACKEND=stub forces offline mode)
+# Without an API key there is no provider (None): made-up readings must never pass for real weather.
+def create_weather_provider(api_key=None, backend=None):
+    backend_name = backend or os.environ.get("PROFI_WEATHER_BACKEND", "openweather")
+    if backend_name == "stub":
+        return WeatherProvider(StubWeatherBackend())
+    if not api_key:
+        return None
+    return WeatherProvider(OpenWeatherBackend(api_key))
+
+def format_weather(city, reading):
+    if reading is None:
+        return "Weather data unavailable"
+    return f"🌤 {reading['city']}: {reading['temp_c']}°C"
@@ -1,30 +1,37 @@
+import time
+RERUN_STARTED = time.perf_counter()  # Streamlit re-executes this script on every interaction
 import sys
 import os
 import streamlit as st
-import time
-from groq import Groq
-import sqlite3
 import datetime
-import requests
-import pandas as pd
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from Process.auth import login_user, register_user
+from Process.auth import login_user, register_user, get_session_user
 
-from Process.database import init_db
+from Process.bootstrap import bootstrap, timed_phase, record_rerun, timing_report
+from Process.database import get_db_connection
+from Process.instrumentation import instrument
 from Process.budget import update_budget, get_budget_summary
-
-# Initialize database
-init_db()
-
-# 🚀 Connect to Database
-
-def get_db_connection():
-    db_path = os.path.join(os.getcwd(), "Process", "users.db")  # Full path to the db
-    return sqlite3.connect(db_path, check_same_thread=False)
-
-# Load API Key
-GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
-groq_client = Groq(api_key=GROQ_API_KEY)
+from Process.reporting import iter_budget_report
+from Process.history import HistoryManager, extractive_summary, SUMMARY_TOKEN_BUDGET
+from Process.interaction_log import log_interaction
+from Process.chat_history import get_chat_page, PAGE_TURNS as CHAT_PAGE_TURNS
+from Process.weather import create_weather_provider, format_weather
+from Process.response_cache import get_cached_response, store_response, should_use_cache, prompt_version, cache_stats
+from Process.llm_gateway import create_llm_gateway, LLMGatewayError
+from Process.financial_context import get_financial_context
+
+# ✅ One-time startup per process (schema setup), cached across reruns and sessions
+@st.cache_resource
+def init_app():
+    bootstrap()
+
+# ✅ Shared LLM gateway (one per process: concurrency limit, retries, coalescing across sessions)
+@st.cache_resource
+def get_llm_gateway():
+    return timed_phase("llm_gateway", create_llm_gateway, api_key=st.secrets["GROQ_API_KEY"])
+
+init_app()
+llm_gateway = get_llm_gateway()
 
 # System Message for Chatbot Personality
 system_message = (
@@ -42,21 +49,103 @@ system_prompt = {
     "role": "system",
     "content": system_message
 }
+SYSTEM_PROMPT_VERSION = prompt_version(system_message)
 # ---------------- Chatbot Functionality ----------------
-def get_response(chat_history):
-    response = groq_client.chat.completions.create(
-        model="llama3-70b-8192",
-        messages=chat_history,
-        max_tokens=300,
-        temperature=1.2
-    )
-
-    chat_response = response.choices[0].message.content
-
-    # Simulated typing effect
-    for word in chat_response.split():
-        yield word + " "
-        time.sleep(0.05)
+LLM_MODEL = "llama3-70b-8192"
+TYPING_DELAY = 0.0  # Optional per-chunk delay (seconds) for a slower typing effect
+LLM_UNAVAILABLE_MESSAGE = "⚠️ ProFi is having trouble reaching its brain right now. Please try again in a moment."
+
+# ✅ Record time-to-first-token and throughput of each response (per session)
+def record_response_metrics(model, started, first_token_at, finished, tokens, coalesced=False, error=False):
+    total = finished - started
+    metrics = {
+        "model": model,
+        "ttft_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+        "total_ms": round(total * 1000, 1),
+        "tokens": tokens,
+        "tokens_per_sec": round(tokens / total, 1) if total > 0 else 0.0,
+        "coalesced": coalesced,
+        "error": error,
+    }
+    st.session_state.setdefault("response_metrics", []).append(metrics)
+    return metrics
+
+# ✅ Stream the completion chunk by chunk through the shared gateway
+@instrument("app.get_response")
+def get_response(chat_history, model=LLM_MODEL, stream=True, typing_delay=TYPING_DELAY):
+    started = time.perf_counter()
+    first_token_at = None
+    tokens = 0
+
+    response = llm_gateway.stream(chat_history, model=model, max_tokens=300, temperature=1.2)
+    try:
+        if not stream:
+            content = "".join(response)
+            first_token_at = time.perf_counter()
+            yield content
+        else:
+            for content in response:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                tokens += 1  # Each content chunk is roughly one token
+                yield content
+
+                if typing_delay:
+                    time.sleep(typing_delay)
+    except LLMGatewayError:
+        yield LLM_UNAVAILABLE_MESSAGE
+        record_response_metrics(model, started, first_token_at, time.perf_counter(), tokens, response.coalesced, error=True)
+        return
+
+    if response.usage is not None:
+        tokens = response.usage["completion_tokens"]
+    record_response_metrics(model, started, first_token_at, time.perf_counter(), tokens, response.coalesced)
+
+# ✅ Fold older turns into the running summary with a small, fast model
+SUMMARY_MODEL = "llama3-8b-8192"
+
+def summarize_history(previous_summary, dropped_messages):
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in dropped_messages)
+    try:
+        summary = llm_gateway.complete(
+            [
+                {"role": "system", "content": "Update the running summary of a budgeting chat. Keep facts the user shared "
+                                              "(amounts, goals, preferences) and open questions. Reply with the summary only, under 150 words."},
+                {"role": "user", "content": f"Current summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"},
+            ],
+            model=SUMMARY_MODEL,
+            max_tokens=SUMMARY_TOKEN_BUDGET,
+            temperature=0.2
+        )
+    except LLMGatewayError:
+        summary = None
+    return summary or extractive_summary(previous_summary, dropped_messages)
+
+# ✅ Chat transcript: the user's persisted turns (older pages loaded on demand) followed by this session's
+# Restored turns are display-only; the model's context is still this session's conversation.
+CHAT_PAGE_MESSAGES = CHAT_PAGE_TURNS * 2
+
+def reset_chat_transcript(username):
+    earlier, cursor = get_chat_page(username) if username else ([], None)
+    st.session_state.chat_user = username
+    st.session_state.chat_earlier = earlier
+    st.session_state.chat_cursor = cursor
+    st.session_state.chat_visible = CHAT_PAGE_MESSAGES
+
+def load_earlier_messages():
+    st.session_state.chat_visible += CHAT_PAGE_MESSAGES
+    loaded = len(st.session_state.chat_earlier) + len(st.session_state.messages) - 1
+    if loaded < st.session_state.chat_visible and st.session_state.chat_cursor is not None:
+        older, cursor = get_chat_page(st.session_state.chat_user, st.session_state.chat_cursor)
+        st.session_state.chat_earlier = older + st.session_state.chat_earlier
+        st.session_state.chat_cursor = cursor
+
+def visible_messages(session_messages):
+    visible = st.session_state.chat_visible
+    shown = session_messages[max(0, len(session_messages) - visible):]
+    remaining = visible - len(shown)
+    earlier = st.session_state.chat_earlier
+    return (earlier[max(0, len(earlier) - remaining):] if remaining > 0 else []) + shown
 
 def main():
    st.set_page_config(page_title="ProFi-Budget Buddy", layout="wide")
@@ -67,10 +156,21 @@ def main():
 if "messages" not in st.session_state:
         st.session_state.messages = [system_prompt]
 
-for message in st.session_state.messages:
-        if message != system_prompt:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
+if "history" not in st.session_state:
+        st.session_state.history = HistoryManager(summarizer=summarize_history)
+
+username = st.session_state.get("user", {}).get("username")  # Unique key (display names can repeat)
+if st.session_state.get("chat_user", False) != username:
+        reset_chat_transcript(username)
+
+# Only the newest CHAT_PAGE_MESSAGES are rendered, so reruns cost the same however long the history gets
+session_messages = st.session_state.messages[1:]
+if st.session_state.chat_cursor is not None or len(st.session_state.chat_earlier) + len(session_messages) > st.session_state.chat_visible:
+        st.button("⬆️ Load earlier messages", on_click=load_earlier_messages)
+
+for message in visible_messages(session_messages):
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
 
 if prompt := st.chat_input("Talk to ProFi"):
         st.session_state.messages.append({"role": "user", "content": prompt})
@@ -78,26 +178,53 @@ if prompt := st.chat_input("Talk to ProFi"):
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        response = get_response(st.session_state.messages)
-        
+        context = get_financial_context(username)
+        # Grounded answers are personal: they only share cache entries with the same snapshot
+        response_version = prompt_version(system_message + context) if context else SYSTEM_PROMPT_VERSION
+        use_cache = should_use_cache(st.session_state.messages, st.session_state.get("use_response_cache", True))
+        cached_response = get_cached_response(prompt, response_version) if use_cache else None
+
         with st.chat_message("assistant"):
-            chat_response = st.write_stream(response)
+            if cached_response is not None:
+                chat_response = cached_response
+                st.markdown(chat_response)
+                st.caption("⚡ cached answer")
+                log_interaction(username, prompt, chat_response)
+            else:
+                response = get_response(st.session_state.history.build(st.session_state.messages, context))
+                chat_response = st.write_stream(response)
+                metrics = st.session_state.response_metrics[-1]
+                if not metrics["error"]:  # Never cache or log the fallback message
+                    st.caption(f"⚡ {metrics['model']} · first token {metrics['ttft_ms']} ms · {metrics['tokens_per_sec']} tokens/s"
+                               + (" · shared answer" if metrics["coalesced"] else ""))
+                    if use_cache:
+                        store_response(username, prompt, response_version, chat_response)
+                    else:
+                        log_interaction(username, prompt, chat_response)
         
         st.session_state.messages.append({"role": "assistant", "content": chat_response})
 
+if st.session_state.get("response_metrics"):
+    with st.expander("Response metrics"):
+        import pandas as pd
+        metrics_df = pd.DataFrame(st.session_state.response_metrics)
+        st.dataframe(metrics_df.groupby("model")[["ttft_ms", "total_ms", "tokens_per_sec"]].mean())
+        st.json(cache_stats())
+        st.json(llm_gateway.stats())
+
+st.sidebar.checkbox("Reuse answers to common questions", value=True, key="use_response_cache")
+
 
 
 # --- Utility Functions ---
+@st.cache_resource
+def get_weather_provider():
+    return create_weather_provider(st.secrets.get("OPENWEATHER_API_KEY"))
+
+@instrument("app.get_weather")
 def get_weather(city):
-    API_KEY = st.secrets["OPENWEATHER_API_KEY"]  # Replace with actual weather API key
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={API_KEY}&units=metric"
-    
-    try:
-        response = requests.get(url).json()
-        temp = response["main"]["temp"]
-        return f"🌤 {city}: {temp}°C"
-    except:
-        return "Weather data unavailable"
+    provider = get_weather_provider()
+    return format_weather(city, provider.get(city) if provider is not None else None)
 
 # --- Sidebar Navigation ---
 menu = ["Login", "Register", "Dashboard", "Admin Panel"]
@@ -138,7 +265,8 @@ elif choice == "Register":
 
 # --- Dashboard ---
 elif choice == "Dashboard":
-    if "user" not in st.session_state:
+    # Signed session token: validated without touching the users table
+    if "user" not in st.session_state or get_session_user(st.session_state["user"].get("token")) is None:
         st.warning("Please log in first.")
         st.stop()
 
@@ -155,12 +283,8 @@ elif choice == "Dashboard":
 
    
 
-    # Budget Summary
-    conn = sqlite3.connect("process/.streamlit/users.db", check_same_thread=False)
-    cursor = conn.cursor()
-
     # Get today's date
-    today_date = datetime.today().strftime('%Y-%m-%d')
+    today_date = datetime.date.today().strftime('%Y-%m-%d')
 
     # Sidebar for Budget Inputs
     st.sidebar.header("📅 Set Your Budget")
@@ -180,51 +304,118 @@ elif choice == "Dashboard":
 
     # Display Budget Summary
     st.subheader("📈 Budget Overview")
-    budget_summary = get_budget_summary()
-
-    if budget_summary:
-      st.write(f"### Today's Budget ({today_date})")
-      st.metric(label="Planned Income", value=f"${budget_summary['planned_income']:.2f}")
-      st.metric(label="Planned Expenses", value=f"${budget_summary['planned_expenses']:.2f}")
-      st.metric(label="Planned Savings", value=f"${budget_summary['planned_savings']:.2f}")
-
-      st.write("### 📌 Actual Financials")
-      st.metric(label="Actual Income", value=f"${budget_summary['actual_income']:.2f}")
-      st.metric(label="Actual Expenses", value=f"${budget_summary['actual_expenses']:.2f}")
-      st.metric(label="Actual Savings", value=f"${budget_summary['actual_savings']:.2f}")
+    budget_summary = get_budget_summary(user["username"])
+
+    if budget_summary["total_planned"] or budget_summary["total_spent"]:
+      st.write(f"### This Month ({today_date[:7]})")
+      st.metric(label="Planned", value=f"${budget_summary['total_planned']:.2f}")
+      st.metric(label="Spent", value=f"${budget_summary['total_spent']:.2f}")
+      st.metric(label="Remaining", value=f"${budget_summary['remaining_budget']:.2f}")
+
+      # Year view: one grouped query for the last 12 months
+      this_month = datetime.date.today().replace(day=1)
+      year_ago = this_month.replace(year=this_month.year - 1)
+      next_month = (this_month + datetime.timedelta(days=31)).replace(day=1)
+      totals = {}
+      for row in iter_budget_report(user["username"], year_ago, next_month, "month"):
+          planned, actual = totals.get(row["period"], (0.0, 0.0))
+          totals[row["period"]] = (planned + row["planned"], actual + row["actual"])
+      st.write("### 📆 Last 12 Months")
+      st.bar_chart({"Planned": {p: t[0] for p, t in totals.items()}, "Actual": {p: t[1] for p, t in totals.items()}})
 
     else:
-     st.warning("No budget data found for today. Please enter your budget in the sidebar.")
-
-    # Close Database Connection
-    conn.close()
+     st.warning("No budget data found for this month. Please enter your budget in the sidebar.")
 
 
     # Financial Goals
     st.subheader("🎯 Financial Goals")
-    conn = sqlite3.connect("Process/users.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT goal_name, target_amount, current_amount FROM financial_goals WHERE user_id=?", (user["id"],))
-    goals = cursor.fetchall()
-    conn.close()
+    from Process.forecasting import forecast_goals  # Only the dashboard needs NumPy
+    goals = forecast_goals(user["username"])
 
     if goals:
         for goal in goals:
-            st.progress(goal[2] / goal[1])
-            st.text(f"{goal[0]}: {goal[2]}/{goal[1]} {user['currency']}")
+            target, saved = goal["target_amount"], goal["current_savings"]
+            st.progress(min(saved / target, 1.0) if target > 0 else 1.0)
+            deadline = f" by {goal['deadline']}" if goal["deadline"] else ""
+            chance = f"{goal['probability']:.0%} chance · " if goal["probability"] is not None else ""
+            st.text(f"{goal['goal_name']}: {saved:,.2f}/{target:,.2f}{deadline} · "
+                    f"{chance}save {goal['required_monthly']:,.2f}/month")
+            if goal["bands"]["p50"]:
+                st.line_chart({"Month": goal["months"], "Pessimistic (p10)": goal["bands"]["p10"], "Median": goal["bands"]["p50"],
+                               "Optimistic (p90)": goal["bands"]["p90"], "Target": [target] * len(goal["bands"]["p50"])},
+                              x="Month", height=180)
     else:
         st.info("No financial goals set yet.")
 
     # Budget Analytics
     st.subheader("📊 Expense Trends")
-    df = pd.DataFrame(
-        {
-            "Category": ["Food", "Rent", "Entertainment", "Savings"],
-            "Amount": [400, 1200, 200, 500],
-        }
-    )
-    st.bar_chart(df.set_index("Category"))
+    from Process.analytics import get_expense_trends  # Only the dashboard needs pandas/NumPy
+    trends = get_expense_trends(user["username"])
+    monthly = trends["monthly"]
+    if monthly.empty:
+        st.info("No transactions recorded yet.")
+    else:
+        latest = monthly.index[-1]
+        st.caption(f"Spending in {latest}")
+        st.bar_chart(monthly.iloc[-1].rename("Amount"))
+
+        st.caption("Monthly spending and rolling average")
+        st.line_chart(monthly.join(trends["rolling"].add_suffix(" (avg)")).set_index(monthly.index.astype(str)))
+
+        if not trends["top_movers"].empty:
+            st.caption("Biggest changes vs. last month")
+            st.dataframe(trends["top_movers"], hide_index=True)
+
+    # Recurring Transactions (rent, salary, subscriptions): written to the ledger when due
+    st.subheader("🔁 Recurring Transactions")
+    from Process.recurring import FREQUENCIES, add_recurring_rule, delete_recurring_rule, list_recurring_rules
+    from Process.ledger import EXPENSE, TRANSACTION_TYPES
+    rules = list_recurring_rules(user["username"])
+    if rules:
+        st.dataframe(rules, hide_index=True, column_order=("category", "amount", "type", "frequency", "next_date", "end_date", "active"))
+        removed = st.selectbox("Remove a rule", [None] + [rule["id"] for rule in rules],
+                               format_func=lambda rule_id: "—" if rule_id is None else
+                               next(f"{r['category']} ({r['frequency']}, {r['amount']:,.2f})" for r in rules if r["id"] == rule_id))
+        if removed is not None and st.button("Remove"):
+            delete_recurring_rule(user["username"], removed)
+            st.rerun()
+
+    with st.form("recurring_rule", clear_on_submit=True):
+        col1, col2, col3 = st.columns(3)
+        rule_category = col1.text_input("Category (e.g., Rent, Salary, Netflix)")
+        rule_amount = col2.number_input("Amount", min_value=0.0, format="%.2f")
+        rule_type = col3.radio("Type", TRANSACTION_TYPES, index=TRANSACTION_TYPES.index(EXPENSE), horizontal=True)
+        rule_frequency = col1.selectbox("Repeats", FREQUENCIES, index=FREQUENCIES.index("monthly"))
+        rule_start = col2.date_input("First occurrence", value=datetime.date.today())
+        rule_end = col3.date_input("Last occurrence (optional)", value=None)
+        if st.form_submit_button("Add recurring transaction") and rule_category:
+            try:
+                add_recurring_rule(user["username"], rule_category, rule_amount, rule_frequency, rule_type, rule_start, rule_end)
+                st.rerun()
+            except ValueError as e:
+                st.error(str(e))
+
+    # Statement Import (CSV / OFX): categorized and written to the ledger in batches
+    from Process.importer import import_statement
+    import_statement()
+
+    # Data Export
+    st.subheader("📦 Your Data")
+    if st.button("Prepare my data export"):
+        from Process.export import export_user_archive
+        st.download_button("Download (CSV, zip)", export_user_archive(user["username"]),
+                           file_name="profi_export.zip", mime="application/zip")
+
+# --- Admin Panel ---
+elif choice == "Admin Panel":
+    from Process.admin import admin_panel
+    admin_panel(llm_gateway)
 
 # --- Logout Button ---
 if "user" in st.session_state:
-    st.sidebar.button("Logout", on_click=lambda: st.session_state.pop("user"))
\ No newline at end of file
+    st.sidebar.button("Logout", on_click=lambda: st.session_state.pop("user"))
+
+# --- Startup / rerun timing ---
+with st.sidebar.expander("⏱ Timing"):
+    st.json(timing_report())
+record_rerun(choice, time.perf_counter() - RERUN_STARTED)
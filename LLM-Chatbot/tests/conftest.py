@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Read when Process is imported, so nothing here ever opens Process/users.db or starts the scheduler thread
+os.environ["PROFI_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="profi-tests-"), "users.db")
+os.environ["PROFI_RECURRING_INTERVAL"] = "0"
+
+# ✅ A fresh, fully migrated database per test
+@pytest.fixture
+def db(tmp_path):
+    from Process.database import configure_pool, init_db
+    pool = configure_pool(str(tmp_path / "users.db"))
+    init_db()
+    yield pool
+    pool.close_all()
+
+# Caches are keyed by username and in-process version counters, so every test gets its own user
+@pytest.fixture
+def username():
+    return f"user-{uuid.uuid4().hex[:8]}"
+
+def fetch_all(sql, params=()):
+    from Process.database import get_db_connection
+    with get_db_connection() as conn:
+        return conn.execute(sql, params).fetchall()
@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from Process.database import ConnectionPool, get_db_connection
+from Process.migrations import MIGRATIONS, check_query_plans, get_schema_version, migrate
+
+from conftest import fetch_all
+
+def test_pool_never_opens_more_than_its_size(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2, timeout=5)
+
+    def worker():
+        for _ in range(10):
+            with pool.connection() as conn:
+                conn.execute("SELECT 1")
+                time.sleep(0.002)  # Hold it long enough for the other threads to queue
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert stats["open"] == 2 and stats["in_use"] == 0
+    assert stats["checkouts"] == 60 and stats["waited_checkouts"] > 0
+    pool.close_all()
+
+def test_pool_times_out_when_exhausted(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1, timeout=0.05)
+    held = pool.acquire()
+    with pytest.raises(sqlite3.OperationalError, match="Timed out"):
+        pool.acquire()
+    pool.release(held)
+    assert pool.stats()["timeouts"] == 1
+    pool.close_all()
+
+def test_connection_rolls_back_on_error(db):
+    with pytest.raises(RuntimeError):
+        with get_db_connection() as conn:
+            conn.execute("INSERT INTO admins (username) VALUES ('mallory')")
+            raise RuntimeError("boom")
+    assert fetch_all("SELECT * FROM admins") == []
+
+def test_migrations_are_applied_once(db):
+    assert get_schema_version() == MIGRATIONS[-1][0]
+    assert migrate() == []
+
+def test_hot_queries_use_indexes(db):
+    slow = {name: result["plan"] for name, result in check_query_plans().items() if not result["uses_index"]}
+    assert slow == {}
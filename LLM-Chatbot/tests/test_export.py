@@ -0,0 +1,52 @@
+import csv
+import io
+import os
+import zipfile
+
+import pytest
+
+from Process.export import export_all, export_stem, export_user_archive
+from Process.ledger import record_transaction
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+def test_export_stems_stay_distinct_and_safe():
+    stems = {export_stem("daily_transactions", name) for name in ("ana/bo", "ana_bo", "ana:bo", "../../etc")}
+    assert len(stems) == 4
+    assert all("/" not in stem and ".." not in stem for stem in stems)
+    assert export_stem("daily_transactions") == "daily_transactions"
+
+def test_incremental_export_resumes_from_the_watermark(db, username, tmp_path):
+    for day in range(1, 4):
+        record_transaction(username, "Food", float(day), date=f"2030-01-0{day}")
+    out_dir = str(tmp_path / "export")
+
+    first = export_all(out_dir, tables=["daily_transactions"], batch_size=2)
+    table = first["tables"][0]
+    assert table["rows"] == 3 and table["batches"] == 2
+    assert [row["amount"] for row in _read_csv(table["path"])] == ["1.0", "2.0", "3.0"]
+
+    assert export_all(out_dir, tables=["daily_transactions"], state=first["state"])["rows"] == 0
+
+    record_transaction(username, "Food", 4.0, date="2030-01-04")
+    second = export_all(out_dir, tables=["daily_transactions"], state=first["state"])
+    assert second["rows"] == 1
+    assert os.path.basename(second["tables"][0]["path"]) == "daily_transactions.4-4.csv"
+    assert not [name for name in os.listdir(out_dir) if name.endswith(".partial")]
+
+def test_user_archive_holds_only_that_user(db, username):
+    record_transaction(username, "Food", 5.0, date="2030-01-01")
+    record_transaction("someone-else", "Food", 9.0, date="2030-01-01")
+
+    with zipfile.ZipFile(io.BytesIO(export_user_archive(username))) as archive:
+        rows = list(csv.DictReader(io.TextIOWrapper(archive.open("daily_transactions.csv"))))
+    assert [(row["username"], row["amount"]) for row in rows] == [(username, "5.0")]
+
+def test_parquet_export(db, username, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    record_transaction(username, "Food", 5.0, date="2030-01-01")
+
+    result = export_all(str(tmp_path), "parquet", username, tables=["daily_transactions"])
+    assert pq.read_table(result["tables"][0]["path"]).column("amount").to_pylist() == [5.0]
@@ -0,0 +1,41 @@
+import time
+from datetime import date
+
+import numpy as np
+import pytest
+
+from Process.forecasting import MAX_HORIZON, MONTHLY_HORIZON, simulate_goals
+
+TODAY = date(2026, 1, 1)
+
+def _history(months=24, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.normal(3000, 300, months), rng.normal(2500, 400, months)
+
+def test_multi_goal_forecast_is_fast():
+    income, expenses = _history()
+    goals = [(f"goal {i}", 1_000_000.0, 0.0, f"{2030 + 4 * i}-06-15") for i in range(12)]
+    goals.append(("far off", 1_000_000.0, 0.0, "2199-01-01"))
+
+    started = time.perf_counter()
+    forecasts = simulate_goals(goals, income, expenses, TODAY)
+    assert time.perf_counter() - started < 1.0
+
+    assert len(forecasts) == len(goals)
+    assert forecasts[-1]["months"][-1] == MAX_HORIZON
+    for forecast in forecasts:
+        months = forecast["months"]
+        assert months[:MONTHLY_HORIZON] == list(range(1, min(months[-1], MONTHLY_HORIZON) + 1))
+        assert all(len(band) == len(months) for band in forecast["bands"].values())
+
+def test_deadline_is_sampled_exactly():
+    income, expenses = _history()
+    forecast, = simulate_goals([("house", 50_000.0, 1_000.0, "2040-03-20")], income, expenses, TODAY)
+    assert forecast["months"][-1] == forecast["months_left"] == 171
+    assert forecast["bands"]["p50"][-1] == pytest.approx(forecast["at_deadline"]["p50"], abs=0.01)
+
+def test_plan_basis_has_no_probability():
+    forecast, = simulate_goals([("trip", 1200.0, 0.0, "2027-01-01")], np.zeros(0), np.zeros(0), TODAY)
+    assert forecast["basis"] == "plan"
+    assert forecast["probability"] is None
+    assert forecast["at_deadline"]["p50"] == 1200.0
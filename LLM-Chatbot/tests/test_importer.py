@@ -0,0 +1,42 @@
+import io
+
+from Process.importer import import_transactions
+from Process.rollup import verify_rollup
+
+from conftest import fetch_all
+
+STATEMENT = """Date,Description,Debit,Credit
+2030-01-02,Coffee shop,-4.50,
+2030-01-03,Landlord,500.00,
+03/01/2030,Payroll,,"2,000.00"
+2030-01-04,Refund,(3.50),
+not a date,Cinema,12.00,
+2030-01-06,Nothing,,
+"""
+
+OFX = """<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20300110120000<TRNAMT>-25.00<NAME>Uber trip</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20300111<TRNAMT>100.00<NAME>Salary</STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+
+def test_csv_statement_import(db, username):
+    report = import_transactions(username, STATEMENT.encode(), batch_size=2)
+
+    assert report["imported"] == 4 and report["batches"] == 2
+    assert report["rejects"] == [{"line": 6, "reason": "unrecognized date 'not a date'"},
+                                 {"line": 7, "reason": "missing amount"}]
+    assert fetch_all("SELECT date, category, amount, type FROM daily_transactions WHERE username = ? ORDER BY date",
+                     (username,)) == [("2030-01-02", "Food", 4.5, "Expense"),
+                                      ("2030-01-03", "Rent", 500.0, "Expense"),
+                                      ("2030-01-03", "Salary", 2000.0, "Income"),
+                                      ("2030-01-04", "Uncategorized", 3.5, "Expense")]
+    assert verify_rollup() == []
+
+def test_ofx_statement_import(db, username):
+    report = import_transactions(username, io.StringIO(OFX), "ofx")
+
+    assert report["imported"] == 2 and report["rejected"] == 0
+    assert fetch_all("SELECT date, category, amount, type FROM daily_transactions WHERE username = ? ORDER BY date",
+                     (username,)) == [("2030-01-10", "Transport", 25.0, "Expense"),
+                                      ("2030-01-11", "Salary", 100.0, "Income")]
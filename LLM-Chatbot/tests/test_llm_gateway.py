@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("groq")
+
+from Process.fake_groq import DEFAULT_REPLY, FakeGroqServer
+from Process.llm_gateway import LLMGatewayError, create_llm_gateway
+
+MODEL = "llama3-70b-8192"
+
+def _ask(text):
+    return [{"role": "user", "content": text}]
+
+@pytest.fixture
+def fake_groq():
+    servers, gateways = [], []
+
+    def start(gateway_options=None, **server_options):
+        server = FakeGroqServer(token_delay=0.001, seed=7, **{"ttft": 0.01, **server_options}).start()
+        gateway = create_llm_gateway(api_key="fake", base_url=server.base_url,
+                                     **{"backoff_base": 0.01, "timeout": 10, **(gateway_options or {})})
+        servers.append(server)
+        gateways.append(gateway)
+        return server, gateway
+
+    yield start
+    for gateway in gateways:
+        gateway.close()
+    for server in servers:
+        server.stop()
+
+def test_identical_prompts_share_one_request(fake_groq):
+    server, gateway = fake_groq(ttft=0.3)
+    first = gateway.stream(_ask("How do I save more?"), MODEL)
+    second = gateway.stream(_ask("How do I save more?"), MODEL)
+    other = gateway.stream(_ask("What is a budget?"), MODEL)
+
+    assert (first.coalesced, second.coalesced, other.coalesced) == (False, True, False)
+    assert "".join(first) == "".join(second) == "".join(other) == DEFAULT_REPLY
+    assert server.stats()["requests"] == 2
+    assert gateway.stats()["coalesced"] == 1
+
+def test_rate_limited_requests_are_retried(fake_groq):
+    server, gateway = fake_groq(ttft=0.2, max_concurrent=1)
+    streams = [gateway.stream(_ask(f"Question {i}"), MODEL) for i in range(2)]
+
+    assert ["".join(stream) for stream in streams] == [DEFAULT_REPLY, DEFAULT_REPLY]
+    assert server.stats()["rate_limited"] >= 1
+    assert gateway.stats()["retries"] >= 1 and gateway.stats()["errors"] == 0
+
+def test_retries_stop_after_max_retries(fake_groq):
+    server, gateway = fake_groq({"max_retries": 2}, error_rate=1.0)
+    with pytest.raises(LLMGatewayError, match="failed"):
+        gateway.complete(_ask("Will this work?"), MODEL)
+
+    assert server.stats()["requests"] == 3
+    assert gateway.stats()["retries"] == 2 and gateway.stats()["errors"] == 1
+
+def test_deadline_covers_the_whole_request(fake_groq):
+    server, gateway = fake_groq(ttft=1.0)
+    with pytest.raises(LLMGatewayError, match="deadline"):
+        gateway.complete(_ask("Slow one"), MODEL, timeout=0.2)
+    assert gateway.stats()["timeouts"] == 1
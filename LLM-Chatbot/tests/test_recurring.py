@@ -0,0 +1,52 @@
+from datetime import date
+
+from Process.recurring import add_recurring_rule, materialize_due_occurrences, occurrence_date
+from Process.rollup import verify_rollup
+
+from conftest import fetch_all
+
+def _ledger(username):
+    return fetch_all("SELECT date, amount, recurrence_key FROM daily_transactions WHERE username = ? ORDER BY date",
+                     (username,))
+
+def test_month_end_rules_return_to_the_original_day():
+    start = date(2026, 1, 31)
+    assert [occurrence_date(start, "monthly", i) for i in range(3)] == [date(2026, 1, 31), date(2026, 2, 28),
+                                                                       date(2026, 3, 31)]
+    assert occurrence_date(date(2024, 2, 29), "yearly", 1) == date(2025, 2, 28)
+
+def test_due_occurrences_are_written_once(db, username):
+    add_recurring_rule(username, "Rent", 500.0, "monthly", start_date="2030-01-15")
+    assert _ledger(username) == []  # Not due yet
+
+    report = materialize_due_occurrences(today="2030-03-20", username=username)
+    assert report["occurrences"] == 3 and report["duplicates"] == 0
+    assert [row[0] for row in _ledger(username)] == ["2030-01-15", "2030-02-15", "2030-03-15"]
+
+    again = materialize_due_occurrences(today="2030-03-20", username=username)
+    assert again["rules"] == 0 and again["occurrences"] == 0
+
+def test_rewound_rule_skips_existing_occurrences(db, username):
+    rule_id = add_recurring_rule(username, "Netflix", 15.0, "monthly", start_date="2030-01-01")
+    materialize_due_occurrences(today="2030-04-01", username=username)
+    before = _ledger(username)
+    assert len(before) == 4
+
+    fetch_all("UPDATE recurring_transactions SET next_date = start_date, occurrences = 0 WHERE id = ?", (rule_id,))
+    report = materialize_due_occurrences(today="2030-04-01", username=username)
+
+    assert report["duplicates"] == 4 and report["occurrences"] == 0
+    assert _ledger(username) == before
+    assert fetch_all("SELECT next_date FROM recurring_transactions WHERE id = ?", (rule_id,)) == [("2030-05-01",)]
+    assert verify_rollup() == []
+
+def test_batches_cover_every_rule_and_stop_at_end_date(db, username):
+    for day in range(1, 6):
+        add_recurring_rule(username, "Gym", 10.0, "weekly", start_date=f"2030-01-0{day}", end_date="2030-01-20")
+
+    report = materialize_due_occurrences(today="2030-02-01", batch_rules=2)
+
+    assert report["batches"] == 3 and report["rules"] == 5
+    assert report["occurrences"] == len(_ledger(username)) == 15
+    assert fetch_all("SELECT COUNT(*) FROM recurring_transactions WHERE active = 1") == [(0,)]
+    assert verify_rollup() == []
@@ -0,0 +1,44 @@
+import pytest
+
+from Process.ledger import INCOME, record_transaction, set_planned_amount
+from Process.reporting import build_report_query, get_budget_report
+
+def _by_period(rows):
+    return {(row["period"], row["category"]): row for row in rows}
+
+@pytest.fixture
+def january(db, username):
+    set_planned_amount(username, "Food", 310.0, month="2030-01")  # 31 days: 10.0 a day
+    set_planned_amount(username, "Salary", 2000.0, INCOME, month="2030-01")
+    record_transaction(username, "Food", 40.0, date="2030-01-05")
+    record_transaction(username, "Food", 60.0, date="2030-01-20")
+    record_transaction(username, "Salary", 2000.0, INCOME, date="2030-01-25")
+    return username
+
+def test_whole_months_read_the_rollup():
+    assert "monthly_category_totals" in build_report_query("2030-01-01", "2030-03-01", "month")
+    assert "monthly_category_totals" not in build_report_query("2030-01-11", "2030-03-01", "month")
+    with pytest.raises(ValueError):
+        build_report_query("2030-01-01", "2030-03-01", "quarter")
+
+def test_whole_month_report(january):
+    rows = get_budget_report(january, "2030-01-01", "2030-02-01")
+    assert [(r["period"], r["category"], r["planned"], r["actual"], r["transactions"]) for r in rows] == \
+        [("2030-01", "Food", 310.0, 100.0, 2)]  # Income rows stay out of spending reports
+
+def test_partial_month_is_prorated(january):
+    food = _by_period(get_budget_report(january, "2030-01-11", "2030-02-01"))[("2030-01", "Food")]
+    assert food["planned"] == pytest.approx(210.0)
+    assert food["actual"] == 60.0 and food["transactions"] == 1
+
+def test_day_and_week_periods_share_the_monthly_plan(january):
+    days = get_budget_report(january, "2030-01-01", "2030-02-01", "day")
+    assert len(days) == 31
+    assert all(row["planned"] == pytest.approx(10.0) for row in days)
+    assert sum(row["actual"] for row in days) == 100.0
+
+    weeks = _by_period(get_budget_report(january, "2029-12-30", "2030-01-14", "week"))
+    assert ("2029-12-24", "Food") not in weeks  # No December plan
+    assert weeks[("2029-12-31", "Food")]["planned"] == pytest.approx(60.0)  # Jan 1-6 of the week starting Dec 31
+    assert weeks[("2030-01-07", "Food")]["planned"] == pytest.approx(70.0)
+    assert weeks[("2029-12-31", "Food")]["actual"] == 40.0
@@ -0,0 +1,38 @@
+from Process.ledger import INCOME, delete_transaction, record_transaction, update_transaction
+from Process.rollup import rebuild_rollup, verify_rollup
+
+from conftest import fetch_all
+
+def test_ledger_writes_keep_the_rollup_in_step(db, username):
+    record_transaction(username, "Food", 12.5, date="2030-01-03")
+    moved = record_transaction(username, "Food", 7.5, date="2030-01-04")
+    dropped = record_transaction(username, "Transport", 3.0, date="2030-02-01")
+    record_transaction(username, "Salary", 1000.0, INCOME, date="2030-01-31")  # Income never reaches the rollup
+
+    update_transaction(username, moved, category="Health", date="2030-02-10")
+    delete_transaction(username, dropped)
+
+    assert verify_rollup() == []
+    assert fetch_all("SELECT month, category, total, txn_count FROM monthly_category_totals WHERE username = ? "
+                     "ORDER BY month, category", (username,)) == [("2030-01", "Food", 12.5, 1),
+                                                                  ("2030-02", "Health", 7.5, 1)]
+
+def test_verify_reports_drift_and_rebuild_repairs_it(db, username):
+    record_transaction(username, "Food", 20.0, date="2030-01-03")
+    record_transaction(username, "Rent", 500.0, date="2030-01-01")
+
+    fetch_all("UPDATE monthly_category_totals SET total = total + 1 WHERE category = 'Food'")
+    fetch_all("DELETE FROM monthly_category_totals WHERE category = 'Rent'")
+    mismatches = {m["key"]: (m["expected"], m["actual"]) for m in verify_rollup()}
+    assert mismatches == {(username, "2030-01", "Food"): ((20.0, 1), (21.0, 1)),
+                          (username, "2030-01", "Rent"): ((500.0, 1), None)}
+
+    rows, remaining = rebuild_rollup()
+    assert rows == 2 and remaining == []
+
+def test_verify_tolerates_float_rounding(db, username):
+    for _ in range(10):
+        record_transaction(username, "Food", 0.1, date="2030-01-03")
+    fetch_all("UPDATE monthly_category_totals SET total = 1.001")
+    assert verify_rollup() == []
+    assert len(verify_rollup(tolerance=0.0001)) == 1